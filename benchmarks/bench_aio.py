@@ -0,0 +1,94 @@
+"""
+Event loop responsiveness while stripping html from blog posts: inline, and
+offloaded with trackmaven_common.aio to thread and process pools. A
+heartbeat sleeps for a millisecond at a time; its lag is how long any other
+request on the loop would have waited.
+
+    python -m benchmarks.bench_aio
+"""
+import asyncio
+import warnings
+
+from trackmaven_common import aio, text
+
+from .corpus import blog_posts
+
+HEARTBEAT = 0.001
+
+
+async def heartbeat(lags, done):
+    loop = asyncio.get_event_loop()
+    while not done.is_set():
+        start = loop.time()
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(loop.time() - start - HEARTBEAT)
+
+
+async def inline(posts):
+    for post in posts:
+        text.strip_html(post)
+        await asyncio.sleep(0)
+
+
+def offloaded(offloader):
+    async def run(posts):
+        await asyncio.gather(
+            *[aio.strip_html(post, offloader=offloader) for post in posts])
+    return run
+
+
+async def measure(work, posts):
+    """
+    Returns the seconds ``work(posts)`` took and the heartbeat lags in
+    seconds while it ran, sorted.
+    """
+    loop = asyncio.get_event_loop()
+    lags = []
+    done = asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(lags, done))
+    start = loop.time()
+    await work(posts)
+    elapsed = loop.time() - start
+    done.set()
+    await beat
+    return elapsed, sorted(lags)
+
+
+async def run_all(corpora):
+    thread = aio.Offloader('thread')
+    process = aio.Offloader('process')
+    runs = (("inline", inline), ("thread pool", offloaded(thread)),
+            ("process pool", offloaded(process)))
+    try:
+        for name, posts in corpora:
+            print("{:<30} {:>10} {:>14} {:>14}".format(
+                "strip_html[{}]".format(name), "total s", "p99 lag ms",
+                "max lag ms"))
+            for label, work in runs:
+                # Warms the pools up, so their start up isn't measured.
+                await work(posts[:10])
+                elapsed, lags = await measure(work, posts)
+                p99 = lags[int(len(lags) * 0.99)] if lags else 0
+                print("{:<30} {:>10.2f} {:>14.2f} {:>14.2f}".format(
+                    label, elapsed, p99 * 1e3, (lags or [0])[-1] * 1e3))
+    finally:
+        thread.close()
+        process.close()
+
+
+def main():
+    warnings.simplefilter('ignore')
+    loop = asyncio.new_event_loop()
+    try:
+        posts = blog_posts(500)
+        # Whole pages of about 150KB, the size that blocks the loop for
+        # tens of milliseconds.
+        pages = ["".join(posts[i:i + 20]) for i in range(0, len(posts), 20)]
+        loop.run_until_complete(
+            run_all((("blog", posts), ("page", pages * 2))))
+    finally:
+        loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Per-call cost of the date helpers.
+
+    python -m benchmarks.bench_dates [number of timestamps]
+"""
+import sys
+
+import arrow
+import pytz
+from dateutil import parser
+
+from trackmaven_common import dates
+
+from .corpus import timestamps
+from .timer import per_call, report
+
+
+def dateutil_iso_to_utc(iso):
+    return parser.parse(iso).replace(tzinfo=pytz.utc)
+
+
+def main(count=200000):
+    stamps = timestamps(count)
+    report("iso_to_utc[dateutil]",
+           per_call(dateutil_iso_to_utc, stamps, repeat=1))
+    report("iso_to_utc", per_call(dates.iso_to_utc, stamps, repeat=3))
+
+    parsed = [dates.iso_to_utc(s) for s in stamps]
+    report("seconds_since_epoch",
+           per_call(dates.seconds_since_epoch, parsed, repeat=3))
+    report("seconds_since_epoch_many",
+           per_call(dates.seconds_since_epoch_many, [parsed]) / len(parsed))
+
+    report("bucketize[arrow, month]",
+           per_call(lambda s: [arrow.get(d).floor('month') for d in s],
+                    [parsed]) / count)
+    for granularity in dates.BUCKET_GRANULARITIES:
+        report("bucketize[{0}]".format(granularity),
+               per_call(lambda s: dates.bucketize(s, granularity),
+                        [parsed]) / count)
+    report("bucketize[day, America/New_York]",
+           per_call(lambda s: dates.bucketize(s, tz='America/New_York'),
+                    [parsed]) / count)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,25 @@
+"""
+Throughput of the strip_html backends.
+
+    python -m benchmarks.bench_html
+"""
+import warnings
+
+from trackmaven_common import text
+
+from .corpus import blog_posts, tweets
+from .timer import per_call, report
+
+
+def main():
+    warnings.simplefilter('ignore')
+    corpora = (("tweet", tweets()), ("blog", blog_posts()))
+    for label, inputs in corpora:
+        for backend in sorted(text.HTML_BACKENDS):
+            micros = per_call(
+                lambda s: text.strip_html(s, backend=backend), inputs)
+            report("strip_html[{}, {}]".format(label, backend), micros)
+
+
+if __name__ == '__main__':
+    main()
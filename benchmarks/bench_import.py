@@ -0,0 +1,71 @@
+"""
+Cost of importing the package modules in a fresh interpreter, as reported
+by ``python -X importtime``.
+
+    python -m benchmarks.bench_import [module ...]
+"""
+import subprocess
+import sys
+
+
+MODULES = (
+    'trackmaven_common',
+    'trackmaven_common.dates',
+    'trackmaven_common.lists',
+    'trackmaven_common.text',
+    'trackmaven_common.urls',
+)
+
+
+def import_times(module):
+    """
+    Returns a dict of every module imported by ``import module`` in a fresh
+    interpreter to its cumulative import time in microseconds.
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.PIPE, universal_newlines=True)
+    _, stderr = process.communicate()
+    if process.returncode:
+        raise RuntimeError(stderr)
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def import_time(module, repeat=5):
+    """
+    Returns the best observed cumulative import time of a module in
+    microseconds, and the modules it imported on that run.
+    """
+    best = None
+    for _ in range(repeat):
+        times = import_times(module)
+        if best is None or times[module] < best[module]:
+            best = times
+    return best[module], best
+
+
+def main(*modules):
+    for module in modules or MODULES:
+        micros, times = import_time(module)
+        report("import {0}".format(module), micros)
+        heaviest = sorted(
+            (name for name in times if name != module and
+             not name.startswith(module + '.')),
+            key=times.get, reverse=True)[:3]
+        for name in heaviest:
+            report("  {0}".format(name), times[name])
+
+
+def report(name, micros):
+    print("{:<40} {:>12.2f} ms".format(name, micros / 1000.0))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,25 @@
+"""
+Cost per row of the list helpers.
+
+    python -m benchmarks.bench_lists
+"""
+from trackmaven_common import lists
+
+from .corpus import dict_rows
+from .timer import per_call, report
+
+
+def main():
+    rows = dict_rows()
+    report("uniquify[dict rows]",
+           per_call(lists.uniquify, [rows], repeat=3) / len(rows))
+
+    def bloom_uniquify(rows):
+        seen = lists.BloomFilter(capacity=len(rows), error_rate=0.001)
+        return lists.uniquify(rows, seen=seen)
+    report("uniquify[dict rows, bloom]",
+           per_call(bloom_uniquify, [rows], repeat=3) / len(rows))
+
+
+if __name__ == '__main__':
+    main()
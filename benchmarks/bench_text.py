@@ -0,0 +1,57 @@
+"""
+Per-call cost of the text extraction helpers.
+
+    python -m benchmarks.bench_text
+"""
+from trackmaven_common import text
+
+import re
+
+from .corpus import ban_list, blog_posts, social_posts, tweets
+from .timer import per_call, report
+
+
+MENTION_REGEX = re.compile(r'(?<!\w)@\w+')
+CASHTAG_REGEX = re.compile(r'\$[A-Z]{1,6}(?:\.[A-Z]{1,2})?\b')
+EMAIL_REGEX = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+
+
+def entities_by_function(post):
+    """
+    What callers did before extract_entities: one scan per kind of entity.
+    """
+    return (text.extract_hashtags(post), text.extract_links(post),
+            MENTION_REGEX.findall(post), CASHTAG_REGEX.findall(post),
+            EMAIL_REGEX.findall(post))
+
+
+def main():
+    corpora = (("tweet", tweets()), ("blog", blog_posts()))
+    for label, inputs in corpora:
+        for func in (text.strip_all_tags, text.extract_links,
+                     text.extract_hashtags, text.extract_raw_text):
+            report("{}[{}]".format(func.__name__, label), per_call(func, inputs))
+
+    banned = ban_list()
+    posts = tweets()
+    report("WordMatcher[{} phrases]".format(len(banned)),
+           per_call(text.WordMatcher, [banned], repeat=3))
+    matcher = text.WordMatcher(banned)
+    report("remove_words_from_text[tweet, list]",
+           per_call(lambda t: text.remove_words_from_text(t, banned),
+                    posts[:50], repeat=3))
+    report("remove_words_from_text[tweet, matcher]",
+           per_call(lambda t: text.remove_words_from_text(t, matcher), posts))
+    report("WordMatcher.find[tweet]", per_call(matcher.find, posts))
+
+    posts = social_posts()
+    report("entities[social, by function]",
+           per_call(entities_by_function, posts))
+    report("extract_entities[social]", per_call(text.extract_entities, posts))
+    report("extract_entities_many[social]",
+           per_call(lambda p: list(text.extract_entities_many(p)),
+                    [posts]) / len(posts))
+
+
+if __name__ == '__main__':
+    main()
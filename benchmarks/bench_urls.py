@@ -0,0 +1,48 @@
+"""
+Per-call cost of the url helpers with and without the url caches, the
+single-parse pipeline against chaining the helpers, and the cache hit rate
+on a realistic url distribution.
+
+    python -m benchmarks.bench_urls
+"""
+from trackmaven_common import urls
+
+from .corpus import urls as url_corpus
+from .timer import per_call, report
+
+
+def validate_url(url):
+    try:
+        return urls.validate_url(url)
+    except ValueError:
+        return None
+
+
+def _pipeline(url):
+    normalized = urls.clean_url(url)
+    return normalized, validate_url(normalized), urls.parse_domain(normalized)
+
+
+def main():
+    inputs = url_corpus()
+    funcs = (urls.clean_url, urls.parse_domain, validate_url,
+             urls.normalize_url, urls.effective_domain)
+    for label, maxsize in (("uncached", 0), ("cached", urls.URL_CACHE_SIZE)):
+        urls.configure_url_cache(maxsize)
+        for func in funcs:
+            report("{}[{}]".format(func.__name__, label),
+                   per_call(func, inputs))
+        report("three_call_pipeline[{}]".format(label),
+               per_call(_pipeline, inputs))
+    # Hit rates for a single cold pass over the corpus.
+    urls.clear_url_cache()
+    for func in funcs:
+        for url in inputs:
+            func(url)
+    for name, info in sorted(urls.url_cache_info().items()):
+        hit_rate = float(info.hits) / (info.hits + info.misses)
+        print("{:<40} {:>12.1%} hit rate".format(name, hit_rate))
+
+
+if __name__ == '__main__':
+    main()
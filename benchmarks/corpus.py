@@ -0,0 +1,190 @@
+"""
+Deterministic, offline fixture corpora for the benchmarks.
+
+Every generator is seeded so runs are comparable between machines and
+commits.
+"""
+import random
+
+WORDS = (
+    "the brand new launch is live today check out our latest spring "
+    "collection marketing team loves this campaign content engagement "
+    "followers growth analytics report weekly customers social media "
+    "competitors share video blog post thanks everyone for amazing support"
+).split()
+
+DOMAINS = (
+    "trackmaven.com", "www.google.com", "blog.example.co.uk", "bit.ly",
+    "t.co", "instagram.com", "www.facebook.com", "news.ycombinator.com",
+    "medium.com", "youtube.com",
+)
+
+
+def _link(rng):
+    scheme = rng.choice(("http://", "https://", ""))
+    path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))
+    return "{}{}/{}".format(scheme, rng.choice(DOMAINS), path)
+
+
+def tweets(count=1000, seed=1):
+    """
+    Returns a list of tweet sized posts with links, hashtags and the
+    occasional stray HTML tag.
+    """
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        tokens = [rng.choice(WORDS) for _ in range(rng.randint(8, 25))]
+        for _ in range(rng.randint(0, 3)):
+            tokens.insert(rng.randint(0, len(tokens)), "#" + rng.choice(WORDS))
+        for _ in range(rng.randint(0, 2)):
+            tokens.insert(rng.randint(0, len(tokens)), _link(rng))
+        if rng.random() < 0.1:
+            tokens.insert(rng.randint(0, len(tokens)), "<b>")
+            tokens.append("</b>")
+        posts.append(" ".join(tokens))
+    return posts
+
+
+def social_posts(count=1000, seed=7):
+    """
+    Returns a list of tweet sized posts with every kind of entity in them:
+    links, hashtags, mentions, cashtags and email addresses.
+    """
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        tokens = [rng.choice(WORDS) for _ in range(rng.randint(8, 25))]
+        extras = (
+            lambda: "#" + rng.choice(WORDS),
+            lambda: "@" + rng.choice(WORDS) + str(rng.randint(0, 99)),
+            lambda: "$" + rng.choice(("AAPL", "GOOG", "TWTR", "BRK.B")),
+            lambda: "{}@{}".format(rng.choice(WORDS), rng.choice(DOMAINS)),
+            lambda: _link(rng),
+        )
+        for _ in range(rng.randint(1, 5)):
+            tokens.insert(rng.randint(0, len(tokens)), rng.choice(extras)())
+        posts.append(" ".join(tokens))
+    return posts
+
+
+def ban_list(count=20000, seed=6):
+    """
+    Returns a brand safety style list of banned words and phrases of up to
+    three words, a few of which appear in the tweets.
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(" ".join(rng.choice(WORDS) + str(rng.randint(0, 999))
+                           for _ in range(rng.randint(1, 3))))
+    return sorted(words) + ["launch is live", "competitors", "#video"]
+
+
+def blog_posts(count=50, seed=2):
+    """
+    Returns a list of blog sized HTML documents (roughly 5-10KB each).
+    """
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(8, 16)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(40, 80))]
+            link = '<a href="{0}">{0}</a>'.format(_link(rng))
+            words.insert(rng.randint(0, len(words)), link)
+            words.insert(rng.randint(0, len(words)), "<em>#{}</em>".format(
+                rng.choice(WORDS)))
+            paragraphs.append("<p>{}</p>".format(" ".join(words)))
+        posts.append(
+            "<html><head><title>{}</title></head><body><h1>{}</h1>\n{}"
+            "</body></html>".format(
+                rng.choice(WORDS), rng.choice(WORDS), "\n".join(paragraphs)))
+    return posts
+
+
+def urls(count=100000, unique=5000, seed=3):
+    """
+    Returns ``count`` raw outbound urls drawn from ``unique`` distinct ones
+    with a Zipf-like distribution, so a few urls are seen very often and
+    most are rarely repeated, the way crawled links are.
+    """
+    rng = random.Random(seed)
+    pool = []
+    for i in range(unique):
+        url = _link(rng)
+        if i % 3 == 0:
+            url = "  {}?utm_source=twitter ".format(url)
+        pool.append(url)
+    weights = [1.0 / (rank + 1) for rank in range(unique)]
+    return rng.choices(pool, weights=weights, k=count)
+
+
+def dict_rows(count=100000, seed=4):
+    """
+    Returns export rows as dicts, about a third of which are duplicates of
+    earlier rows, some with nested lists.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < 0.33:
+            rows.append(dict(rng.choice(rows)))
+            continue
+        row = {
+            "id": rng.randint(0, count),
+            "brand": rng.choice(WORDS),
+            "network": rng.choice(("twitter", "facebook", "instagram")),
+            "engagement": rng.randint(0, 10000),
+        }
+        if i % 4 == 0:
+            row["hashtags"] = ["#" + rng.choice(WORDS) for _ in range(3)]
+        rows.append(row)
+    return rows
+
+
+def search_hits(count=20000, seed=8):
+    """
+    Returns Elasticsearch style hits of social posts, with the author and
+    tags nested the way our indexes store them, some fields missing.
+    """
+    rng = random.Random(seed)
+    hits = []
+    for i in range(count):
+        post = {
+            "title": " ".join(rng.choice(WORDS) for _ in range(6)),
+            "author": {"name": rng.choice(WORDS), "profile": {}},
+            "engagement": rng.randint(0, 10000),
+        }
+        if i % 3:
+            post["author"]["profile"]["bio"] = " ".join(
+                rng.choice(WORDS) for _ in range(12))
+        if i % 2:
+            post["tags"] = [rng.choice(WORDS) for _ in range(3)]
+        hits.append({"_id": str(i), "_source": post})
+    return hits
+
+
+def timestamps(count=200000, seed=5):
+    """
+    Returns ISO 8601 timestamp strings in the shapes our APIs return them,
+    with the odd one dateutil has to parse.
+    """
+    rng = random.Random(seed)
+    shapes = (
+        "{date} {time}", "{date}T{time}", "{date}T{time}Z",
+        "{date}T{time}.{micros}Z", "{date}T{time}+00:00", "{date}",
+    )
+    stamps = []
+    for _ in range(count):
+        date = "{:04d}-{:02d}-{:02d}".format(
+            rng.randint(2010, 2020), rng.randint(1, 12), rng.randint(1, 28))
+        time = "{:02d}:{:02d}:{:02d}".format(
+            rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+        if rng.random() < 0.01:
+            stamps.append("June {}, {}".format(rng.randint(1, 28), date[:4]))
+            continue
+        shape = rng.choice(shapes)
+        stamps.append(shape.format(
+            date=date, time=time, micros=rng.randint(0, 999999)))
+    return stamps
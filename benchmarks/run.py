@@ -0,0 +1,203 @@
+"""
+Runs the benchmark suite and checks it against a stored baseline.
+
+    python -m benchmarks.run [--save] [--baseline FILE] [--tolerance 0.25]
+                             [name ...]
+
+Every case is timed several times, each run right after a fixed
+calibration loop, and its cost is the median ratio of the two, so a
+baseline recorded on one machine still gates runs on a faster or slower
+(or busier) one. The spread of those ratios is the case's noise: a case
+only fails when it is slower than its baseline by more than the tolerance
+and more than three times the noise of either run. Peak memory is traced
+with tracemalloc. The command exits with status 1 when a case regresses.
+``--save`` records the results as the new baseline; with case names, only
+those cases are run (and saved).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from .suite import cases
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Runs of every case, each after a calibration run. The median of their
+# ratios is the case's cost.
+REPEAT = 9
+# How long a run of a case takes at least, in seconds.
+MIN_RUN_SECONDS = 0.04
+# A case fails when it is slower by more than this many times its noise,
+# on top of the tolerance.
+NOISE_FACTOR = 3
+
+# Memory is much steadier than time, but allocator noise can move small
+# peaks by a few KiB either way.
+MEMORY_TOLERANCE = 0.10
+MEMORY_SLACK_KIB = 32
+
+
+def calibration_work():
+    """
+    A fixed mix of interpreter work: arithmetic, string building and dict
+    and list churn, taking around 10ms.
+    """
+    counts = {}
+    for i in range(20000):
+        key = str(i % 997)
+        counts[key] = counts.get(key, 0) + i * i
+    return sorted(counts.items())
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def measure(case, repeat=REPEAT):
+    """
+    Returns the median time in microseconds per item of a case, its cost
+    relative to the calibration loop, the noise of that cost (the spread
+    of its middle half of runs, relative to the median) and its peak
+    traced memory in KiB.
+    """
+    gc.collect()
+    timer = timeit.Timer(lambda: case.func(case.inputs))
+    calibration = timeit.Timer(calibration_work)
+    number = 1
+    while timer.timeit(number) < MIN_RUN_SECONDS:
+        number *= 2
+    times = []
+    ratios = []
+    for _ in range(repeat):
+        calibrated = calibration.timeit(1)
+        seconds = timer.timeit(number) / number / len(case.inputs)
+        times.append(seconds)
+        ratios.append(seconds / calibrated)
+    ratios.sort()
+    relative = median(ratios)
+    quarter = len(ratios) // 4
+    noise = (ratios[-1 - quarter] - ratios[quarter]) / relative
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.func(case.inputs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'micros': median(times) * 1e6,
+        'relative': relative,
+        'noise': noise,
+        'peak_kib': peak / 1024.0,
+    }
+
+
+def remeasure(case, result, baseline, tolerance, attempts=2):
+    """
+    Measures a case that looks like it regressed again, keeping its
+    cheapest run, to tell a regression from a noisy neighbour.
+    """
+    for _ in range(attempts):
+        if not compare(result, baseline, tolerance):
+            break
+        retry = measure(case)
+        if retry['relative'] < result['relative']:
+            result = dict(retry, peak_kib=result['peak_kib'])
+    return result
+
+
+def change(result, baseline):
+    """
+    Returns how much slower (or faster, if negative) a result is than its
+    baseline, as a fraction.
+    """
+    return result['relative'] / baseline['relative'] - 1
+
+
+def compare(result, baseline, tolerance):
+    """
+    Returns the problems with a result against its baseline, if any.
+    """
+    problems = []
+    allowed = max(tolerance, NOISE_FACTOR * max(result['noise'],
+                                                baseline['noise']))
+    if change(result, baseline) > allowed:
+        problems.append('slower: {0:+.0%}, {1:.0%} allowed'.format(
+            change(result, baseline), allowed))
+    allowed = (baseline['peak_kib'] * (1 + MEMORY_TOLERANCE) +
+               MEMORY_SLACK_KIB)
+    if result['peak_kib'] > allowed:
+        problems.append('memory: {0:.0f}KiB > {1:.0f}KiB allowed'.format(
+            result['peak_kib'], allowed))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('names', nargs='*', help='only run these cases')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown, as a fraction')
+    parser.add_argument('--save', action='store_true',
+                        help='record the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.baseline) as fd:
+            baseline = json.load(fd)
+    except IOError:
+        baseline = {'cases': {}}
+    # Cases recorded before costs were calibrated can't be compared.
+    baseline['cases'] = dict(
+        (name, case) for name, case in baseline['cases'].items()
+        if 'relative' in case)
+
+    results = {}
+    for case in cases():
+        if args.names and case.name not in args.names:
+            continue
+        result = measure(case)
+        expected = baseline['cases'].get(case.name)
+        if expected is not None and not args.save:
+            result = remeasure(case, result, expected, args.tolerance)
+        results[case.name] = result
+
+    print('{:<44} {:>10} {:>12} {:>10} {:>6} {:>8}'.format(
+        'case', 'us/item', 'items/s', 'peak KiB', 'noise', 'change'))
+    failures = []
+    for name, result in sorted(results.items()):
+        expected = baseline['cases'].get(name)
+        difference = ''
+        if expected is not None:
+            difference = '{0:+.0%}'.format(change(result, expected))
+            failures.extend('{0}: {1}'.format(name, problem) for problem in
+                            compare(result, expected, args.tolerance))
+        print('{:<44} {:>10.2f} {:>12,.0f} {:>10.0f} {:>6.0%} {:>8}'.format(
+            name, result['micros'], 1e6 / result['micros'],
+            result['peak_kib'], result['noise'], difference))
+
+    if args.save:
+        saved = baseline['cases'] if args.names else {}
+        saved.update(results)
+        with open(args.baseline, 'w') as fd:
+            json.dump({'python': platform.python_version(), 'cases': saved},
+                      fd, indent=2, sort_keys=True)
+            fd.write('\n')
+        print('saved the baseline to {0}'.format(args.baseline))
+        return 0
+    for failure in failures:
+        print('REGRESSION ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+The cases run by ``python -m benchmarks.run``: the public helpers, each run
+over a fixed, offline corpus of the inputs it sees in production.
+
+Left out: ``dates.today``, ``now``, ``last_week`` and ``last_month``, which
+read the clock; ``dates.get_timezone``, a cached lookup the time zone cases
+go through; ``lists.iter_unique``, which ``uniquify`` runs; the ``*_many``
+text and fingerprint helpers, which are their per-item helper in process
+and time the machine with a pool; and the url cache settings.
+"""
+from collections import namedtuple
+from datetime import timedelta
+import warnings
+
+from trackmaven_common import dates, fingerprint, lists, text, urls
+
+from .corpus import (ban_list, blog_posts, dict_rows, search_hits,
+                     social_posts, timestamps, tweets)
+from .corpus import urls as url_corpus
+
+# ``func(inputs)`` does the work of one run of a case, ``len(inputs)`` items
+# of it.
+Case = namedtuple('Case', ['name', 'func', 'inputs'])
+
+
+def each(func):
+    return lambda items: [func(item) for item in items]
+
+
+def each_uncached(func):
+    """
+    Like `each`, starting from empty url caches so that every run of the
+    case sees the same hit rate.
+    """
+    def run(items):
+        urls.clear_url_cache()
+        return [func(item) for item in items]
+    return run
+
+
+def validate_url(url):
+    try:
+        return urls.validate_url(url)
+    except ValueError:
+        return None
+
+
+def cases():
+    # bs4 warns about guessing the parser on every call.
+    warnings.simplefilter('ignore')
+    tweet_corpus = tweets()
+    blog_corpus = blog_posts(20)
+    social_corpus = social_posts()
+    url_list = url_corpus(20000)
+    rows = dict_rows(20000)
+    hits = search_hits()
+    stamps = timestamps(20000)
+    parsed = [dates.iso_to_utc(stamp) for stamp in stamps]
+    matcher = text.WordMatcher(ban_list())
+    keys = sorted(rows[0])
+    names = [row['brand'].split() * 3 for row in rows[:5000]]
+    days = [stamp.date() for stamp in parsed]
+    date_keys = [day.strftime('%y%m%d') for day in days]
+    buckets = dates.bucketize(parsed, 'week')
+    extractor = text.compile_text_extractor(
+        ['_source.title', '_source.author.name', '_source.author.profile.bio',
+         '_source.tags[0]', '_source.engagement'])
+
+    return [
+        Case('text.clean_string[tweet]', each(text.clean_string),
+             tweet_corpus),
+        Case('text.truncate_string[tweet]',
+             each(lambda s: text.truncate_string(s, 50, whole_words=True)),
+             tweet_corpus),
+        Case('text.clean_and_truncate[blog]',
+             each(lambda s: text.clean_and_truncate([s], 200)), blog_corpus),
+        Case('text.strip_html[blog]', each(text.strip_html), blog_corpus),
+        Case('text.strip_html[blog, bs4]',
+             each(lambda s: text.strip_html(s, backend='bs4')), blog_corpus),
+        Case('text.strip_all_tags[blog]', each(text.strip_all_tags),
+             blog_corpus),
+        Case('text.extract_links[tweet]', each(text.extract_links),
+             tweet_corpus),
+        Case('text.extract_links[blog]', each(text.extract_links),
+             blog_corpus),
+        Case('text.extract_hashtags[tweet]', each(text.extract_hashtags),
+             tweet_corpus),
+        Case('text.extract_raw_text[tweet]', each(text.extract_raw_text),
+             tweet_corpus),
+        Case('text.parse_text[tweet]', each(text.parse_text), tweet_corpus),
+        Case('text.remove_words_from_text[tweet]',
+             each(lambda s: text.remove_words_from_text(s, matcher)),
+             tweet_corpus),
+        Case('text.WordMatcher.find[tweet]', each(matcher.find),
+             tweet_corpus),
+        Case('text.iter_clean_string[blog]',
+             each(lambda s: ''.join(text.iter_clean_string(s, 1024))),
+             blog_corpus),
+        Case('text.humanize_join[names]',
+             each(lambda items: text.humanize_join(items, 2)), names),
+        Case('text.extract_entities[social]', each(text.extract_entities),
+             social_corpus),
+        Case('text.extract_text_from_dict[rows]',
+             each(lambda row: text.extract_text_from_dict(row, keys)), rows),
+        Case('text.TextExtractor.many[hits]',
+             lambda items: list(extractor.many(items)), hits),
+        Case('fingerprint.simhash[social]', each(fingerprint.simhash),
+             social_corpus),
+        Case('fingerprint.minhash[social]', each(fingerprint.minhash),
+             social_corpus),
+        Case('fingerprint.remove_near_duplicates[social]',
+             fingerprint.remove_near_duplicates, social_corpus),
+        Case('urls.httpsify', each(urls.httpsify), url_list),
+        Case('urls.public_suffix', each_uncached(urls.public_suffix),
+             url_list),
+        Case('urls.normalize_many',
+             lambda items: list(urls.normalize_many(items)), url_list),
+        Case('urls.group_by_domain', urls.group_by_domain, url_list),
+        Case('urls.clean_url', each_uncached(urls.clean_url), url_list),
+        Case('urls.validate_url', each_uncached(validate_url), url_list),
+        Case('urls.parse_domain', each_uncached(urls.parse_domain),
+             url_list),
+        Case('urls.normalize_url', each_uncached(urls.normalize_url),
+             url_list),
+        Case('urls.effective_domain', each_uncached(urls.effective_domain),
+             url_list),
+        Case('lists.uniquify[rows]', lists.uniquify, rows),
+        Case('lists.uniquify[rows, bloom]',
+             lambda items: lists.uniquify(
+                 items, seen=lists.BloomFilter(len(items))), rows),
+        Case('lists.split_every[rows]',
+             lambda items: lists.split_every(items, 100), rows),
+        Case('lists.iter_chunks[rows]',
+             lambda items: list(lists.iter_chunks(iter(items), 100)), rows),
+        Case('lists.map_chunks[rows]',
+             lambda items: list(lists.map_chunks(len, items, 1000)), rows),
+        Case('lists.get_index[rows]',
+             each(lambda row: lists.get_index(row.get('hashtags', []), 1)),
+             rows),
+        Case('dates.iso_to_utc', each(dates.iso_to_utc), stamps),
+        Case('dates.iso_to_timezone_many',
+             lambda items: dates.iso_to_timezone_many(
+                 items, 'America/New_York'), stamps),
+        Case('dates.seconds_since_epoch_many', dates.seconds_since_epoch_many,
+             parsed),
+        Case('dates.seconds_since_epoch', each(dates.seconds_since_epoch),
+             parsed),
+        Case('dates.days_since_epoch', each(dates.days_since_epoch), days),
+        Case('dates.days_since_epoch_many', dates.days_since_epoch_many,
+             days),
+        Case('dates.force_to_date', each(dates.force_to_date), parsed),
+        Case('dates.date_key_to_iso', each(dates.date_key_to_iso),
+             date_keys),
+        Case('dates.daily_date_range[month]',
+             each(lambda day: dates.daily_date_range(day, 30)), days[:2000]),
+        Case('dates.DateRange[year, week]',
+             each(lambda day: list(dates.DateRange(
+                 day, day + timedelta(days=365), granularity='week'))),
+             days[:2000]),
+        Case('dates.bucket_start[week]',
+             each(lambda bucket: dates.bucket_start(bucket, 'week')),
+             list(buckets)),
+        Case('dates.aggregate_buckets', dates.aggregate_buckets,
+             list(buckets)),
+        Case('dates.bucketize[week]',
+             lambda items: dates.bucketize(items, 'week'), parsed),
+        Case('dates.bucketize[month, tz]',
+             lambda items: dates.bucketize(items, 'month', 'Europe/Paris'),
+             parsed),
+    ]
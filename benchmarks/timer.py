@@ -0,0 +1,15 @@
+import timeit
+
+
+def per_call(func, inputs, repeat=5):
+    """
+    Returns the best observed cost in microseconds of calling ``func`` once
+    for every item in ``inputs``.
+    """
+    timer = timeit.Timer(lambda: [func(i) for i in inputs])
+    best = min(timer.repeat(repeat=repeat, number=1))
+    return best / len(inputs) * 1e6
+
+
+def report(name, micros):
+    print("{:<40} {:>12.2f} us/call".format(name, micros))
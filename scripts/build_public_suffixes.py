@@ -0,0 +1,72 @@
+"""
+Regenerates trackmaven_common/_public_suffixes.py from a copy of the Public
+Suffix List.
+
+    python scripts/build_public_suffixes.py public_suffix_list.dat
+
+The list itself can be downloaded from
+https://publicsuffix.org/list/public_suffix_list.dat
+"""
+import io
+import os
+import sys
+
+OUTPUT = os.path.join(
+    os.path.dirname(__file__), os.pardir, 'trackmaven_common',
+    '_public_suffixes.py')
+
+TEMPLATE = '''# -*- coding: utf-8 -*-
+"""
+Rules from the Public Suffix List (https://publicsuffix.org/), generated by
+scripts/build_public_suffixes.py. Do not edit by hand.
+
+The list is subject to the terms of the Mozilla Public License, v. 2.0. If
+a copy of the MPL was not distributed with this file, you can obtain one at
+https://mozilla.org/MPL/2.0/.
+"""
+
+ICANN_RULES = u"""
+{icann}
+"""
+
+PRIVATE_RULES = u"""
+{private}
+"""
+'''
+
+
+def read_rules(path):
+    sections = {'ICANN': [], 'PRIVATE': []}
+    section = None
+    with io.open(path, encoding='utf-8') as fd:
+        for line in fd:
+            line = line.strip()
+            if line.startswith('// ===BEGIN '):
+                section = line.split()[2]
+            elif line.startswith('// ===END '):
+                section = None
+            elif line and not line.startswith('//') and section:
+                sections[section].append(line.split()[0])
+    return sections
+
+
+def wrap(rules, width=79):
+    lines, line = [], ''
+    for rule in rules:
+        if line and len(line) + len(rule) + 1 > width:
+            lines.append(line)
+            line = ''
+        line = (line + ' ' + rule).strip()
+    lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(path):
+    sections = read_rules(path)
+    with io.open(OUTPUT, 'w', encoding='utf-8') as fd:
+        fd.write(TEMPLATE.format(
+            icann=wrap(sections['ICANN']), private=wrap(sections['PRIVATE'])))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -1,10 +1,11 @@
 import re
 from setuptools import setup, find_packages
 
-packages = find_packages(exclude=['tests'])
+packages = find_packages(exclude=['tests', 'tests.*', 'benchmarks', 'benchmarks.*'])
 requires = [
-    'arrow == 0.17.0',
-    'beautifulsoup4 == 4.9.3'
+    'beautifulsoup4 == 4.9.3',
+    'python-dateutil',
+    'pytz',
 ]
 
 __version__ = ''
@@ -34,4 +35,8 @@ setup(
     packages=packages,
     include_package_data=True,
     install_requires=requires,
+    extras_require={
+        'lxml': ['lxml'],
+        'numpy': ['numpy'],
+    },
 )
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+asyncio = pytest.importorskip('asyncio')
+
+from trackmaven_common import aio, text  # noqa: E402
+
+
+def run(make):
+    """
+    Runs the awaitable ``make()`` returns on a new event loop.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(make())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+@pytest.fixture
+def offloader(request):
+    offloader = aio.Offloader('thread', workers=2, batch_size=4)
+    request.addfinalizer(offloader.close)
+    return offloader
+
+
+def test_run_batches_calls(offloader, monkeypatch):
+    batches = []
+    original = aio._call_each
+
+    def call_each(func, items):
+        batches.append(len(items))
+        return original(func, items)
+    monkeypatch.setattr(aio, '_call_each', call_each)
+
+    strings = ['  a  {0} '.format(i) for i in range(10)]
+    results = run(lambda: asyncio.gather(
+        *[offloader.run(text.clean_string, s) for s in strings]))
+    assert results == [text.clean_string(s) for s in strings]
+    assert batches == [4, 4, 2]
+
+
+def test_run_fails_only_the_bad_call(offloader):
+    results = run(lambda: asyncio.gather(
+        offloader.run(text.clean_string, ' a '),
+        offloader.run(text.clean_string, None),
+        return_exceptions=True))
+    assert results[0] == 'a'
+    assert isinstance(results[1], AttributeError)
+
+
+def test_map(offloader):
+    strings = ['<p>{0}</p>'.format(i) for i in range(11)]
+    assert run(lambda: offloader.map(text.strip_html, strings)) == [
+        str(i) for i in range(11)]
+
+
+def test_map_reads_items_as_batches_finish():
+    read = []
+    ahead = []
+
+    def items():
+        for i in range(40):
+            read.append(i)
+            yield i
+
+    def record(item):
+        ahead.append(len(read) - item)
+        return item
+
+    offloader = aio.Offloader('thread', workers=1, batch_size=2,
+                              max_pending=6)
+    try:
+        assert run(lambda: offloader.map(record, items())) == list(range(40))
+    finally:
+        offloader.close()
+    assert max(ahead) <= 6
+
+
+def test_running_batches_are_bounded():
+    active = []
+    most = []
+    lock = threading.Lock()
+
+    def slow(item):
+        with lock:
+            active.append(item)
+            most.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(item)
+        return item
+
+    offloader = aio.Offloader('thread', workers=4, batch_size=1,
+                              max_pending=3)
+    try:
+        assert run(lambda: asyncio.gather(
+            *[offloader.run(slow, i) for i in range(12)])) == list(range(12))
+    finally:
+        offloader.close()
+    assert max(most) <= 3
+
+
+def test_helpers(offloader):
+    page = '<p>Hi <b>there</b> #fun http://google.com</p>'
+    results = run(lambda: asyncio.gather(
+        aio.strip_html(page, offloader=offloader),
+        aio.strip_html(page, backend='bs4', offloader=offloader),
+        aio.strip_all_tags(page, offloader=offloader),
+        aio.extract_raw_text('Hi #fun', offloader=offloader),
+        aio.parse_text('Hi #fun', offloader=offloader),
+        aio.normalize_url('google.com', offloader=offloader)))
+    assert results[:4] == [
+        text.strip_html(page), text.strip_html(page, backend='bs4'),
+        text.strip_all_tags(page), 'Hi']
+    assert results[4] == text.parse_text('Hi #fun')
+    assert results[5].domain == 'google.com'
+
+
+def test_process_pool_and_new_loops():
+    offloader = aio.Offloader(workers=2)
+    try:
+        for _ in range(2):
+            assert run(lambda: asyncio.gather(
+                offloader.run(text.clean_string, ' a '),
+                offloader.map(text.clean_string, [' b ', ' c ']))) == [
+                    'a', ['b', 'c']]
+    finally:
+        offloader.close()
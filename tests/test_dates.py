@@ -1,8 +1,40 @@
-from trackmaven_common.dates import iso_to_utc, daily_date_range, force_to_date
+from trackmaven_common.dates import (
+    today, last_week, last_month, iso_to_utc, daily_date_range,
+    force_to_date, seconds_since_epoch, days_since_epoch,
+    seconds_since_epoch_many, days_since_epoch_many, DateRange, bucketize,
+    bucket_start, aggregate_buckets, get_timezone, to_timezone,
+    to_timezone_many, iso_to_timezone, iso_to_timezone_many)
 
+from dateutil import parser
+import pytz
 from pytz import UTC
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from array import array
 import pytest
+import subprocess
+import sys
+
+
+def test_today_last_week_last_month():
+    before = datetime.now(UTC)
+    now = today()
+    after = datetime.now(UTC)
+    assert now.utcoffset() == timedelta(0)
+    assert before <= now <= after
+    week_ago = last_week()
+    assert week_ago.utcoffset() == timedelta(0)
+    assert timedelta(days=6) < now - week_ago <= timedelta(days=7)
+    assert timedelta(days=29) < now - last_month() <= timedelta(days=30)
+
+
+@pytest.mark.skipif(sys.version_info < (3,),
+                    reason='Python 2 has no datetime.timezone, UTC is pytz')
+def test_import_is_stdlib_only():
+    code = ("import sys, trackmaven_common.dates; "
+            "print(sorted(m for m in ('arrow', 'dateutil', 'pytz') "
+            "if m in sys.modules))")
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert output.strip() == b'[]'
 
 
 def test_iso_to_utc_case_1():
@@ -21,6 +53,79 @@ def test_iso_to_utc_case_2():
     assert timestamp == expected
 
 
+@pytest.mark.parametrize('iso', [
+    "2014-07-03",
+    "2014-07-03T10:20",
+    "2014-07-03T10:20:30.5",
+    "2014-07-03T10:20:30.123456Z",
+    "2014-07-03 10:20:30+05:00",
+    "2014-07-03T10:20:30-0330",
+    "2014-07-03T10:20:30.1234567",
+    "July 3rd 2014 10:20",
+])
+def test_iso_to_utc_matches_dateutil(iso):
+    expected = parser.parse(iso).replace(tzinfo=UTC)
+    timestamp = iso_to_utc(iso)
+    assert timestamp == expected
+    assert timestamp.tzinfo is UTC
+
+
+def test_iso_to_utc_invalid():
+    with pytest.raises(ValueError):
+        iso_to_utc("2014-02-30 00:00:00")
+
+
+def test_get_timezone_is_cached():
+    zone = get_timezone('America/New_York')
+    assert get_timezone('America/New_York') is zone
+    assert get_timezone(zone) is zone
+    assert get_timezone('UTC').utcoffset(None) == timedelta(0)
+    with pytest.raises(KeyError):
+        get_timezone('Mars/Olympus_Mons')
+
+
+@pytest.mark.parametrize('iso', [
+    "2014-07-03",
+    "2014-07-03T10:20:30Z",
+    "2014-07-03 10:20:30+05:30",
+    "2014-11-02T05:30:00-0000",
+    "2014-11-02T01:30:00-04:00",
+    "July 3rd 2014 10:20 -0700",
+])
+def test_iso_to_timezone_matches_dateutil(iso):
+    expected = parser.parse(iso)
+    if expected.tzinfo is None:
+        expected = expected.replace(tzinfo=UTC)
+    expected = expected.astimezone(pytz.timezone('America/New_York'))
+    actual = iso_to_timezone(iso, 'America/New_York')
+    # Aware datetimes in ambiguous hours never compare equal across time
+    # zone implementations, so their wall clock times and offsets are
+    # compared instead.
+    assert actual.utcoffset() == expected.utcoffset()
+    assert actual.replace(tzinfo=None) == expected.replace(tzinfo=None)
+
+
+def test_iso_to_timezone_assume():
+    actual = iso_to_timezone("2014-07-03 10:20", assume='Asia/Kolkata')
+    assert actual == datetime(2014, 7, 3, 4, 50, tzinfo=UTC)
+    assert actual.utcoffset() == timedelta(0)
+    assert iso_to_timezone_many(
+        ["2014-07-03", "2014-07-03T10:20-04:00"], 'Asia/Tokyo') == [
+        datetime(2014, 7, 3, tzinfo=UTC),
+        datetime(2014, 7, 3, 14, 20, tzinfo=UTC)]
+
+
+def test_to_timezone():
+    paris = pytz.timezone('Europe/Paris')
+    # Naive datetimes are localized, not given pytz's LMT offset.
+    actual = to_timezone(datetime(2015, 3, 8, 1, 30), 'America/New_York',
+                         assume=paris)
+    assert actual == paris.localize(datetime(2015, 3, 8, 1, 30))
+    assert actual.utcoffset() == timedelta(hours=-5)
+    stamps = [datetime(2015, 6, 18, 15, tzinfo=UTC), datetime(2015, 6, 18, 15)]
+    assert [d.hour for d in to_timezone_many(stamps, 'Asia/Tokyo')] == [0, 0]
+
+
 def test_daily_date_range():
     timestamp = date(2014, 1, 1)
     expected = [
@@ -33,6 +138,58 @@ def test_daily_date_range():
     assert expected == actual
 
 
+def test_date_range_daily():
+    r = DateRange(date(2014, 1, 1), date(2016, 1, 1))
+    assert len(r) == 730
+    assert r[0] == date(2014, 1, 1)
+    assert r[-1] == date(2015, 12, 31)
+    assert list(r[:3]) == [date(2014, 1, 1), date(2014, 1, 2),
+                           date(2014, 1, 3)]
+    assert date(2015, 6, 1) in r
+    assert date(2016, 1, 1) not in r
+    assert datetime(2015, 6, 1) not in r
+    with pytest.raises(IndexError):
+        r[730]
+
+
+def test_date_range_step_and_slices():
+    start = datetime(2014, 1, 1, tzinfo=UTC)
+    r = DateRange(start, start + timedelta(days=2), step=5,
+                  granularity='hour')
+    expected = [start + timedelta(hours=h) for h in range(0, 48, 5)]
+    assert list(r) == expected
+    assert len(r) == len(expected)
+    assert list(r[1::3]) == expected[1::3]
+    assert list(r[::-2]) == expected[::-2]
+    assert list(reversed(r)) == expected[::-1]
+    assert start + timedelta(hours=10) in r
+    assert start + timedelta(hours=11) not in r
+
+    weeks = DateRange(date(2014, 3, 1), date(2014, 1, 1), step=-1,
+                      granularity='week')
+    assert list(weeks) == [date(2014, 3, 1) - timedelta(weeks=w)
+                           for w in range(9)]
+
+
+def test_date_range_months_clamp_to_month_end():
+    r = DateRange(date(2014, 1, 31), date(2014, 6, 1), granularity='month')
+    assert list(r) == [date(2014, 1, 31), date(2014, 2, 28),
+                       date(2014, 3, 31), date(2014, 4, 30),
+                       date(2014, 5, 31)]
+    assert list(r[1:]) == list(r)[1:]
+    assert date(2014, 3, 31) in r
+    assert date(2014, 3, 28) not in r
+
+
+def test_date_range_invalid():
+    with pytest.raises(ValueError):
+        DateRange(date(2014, 1, 1), date(2015, 1, 1), granularity='year')
+    with pytest.raises(ValueError):
+        DateRange(date(2014, 1, 1), date(2015, 1, 1), step=0)
+    with pytest.raises(TypeError):
+        DateRange(date(2014, 1, 1), date(2015, 1, 1), granularity='hour')
+
+
 def test_force_to_date_date():
     d1 = date(2014, 1, 1)
     d2 = force_to_date(d1)
@@ -48,3 +205,88 @@ def test_force_to_date_datetime():
 def test_force_to_date_invalid():
     with pytest.raises(TypeError):
         force_to_date("test")
+
+
+def test_seconds_since_epoch_many():
+    start = datetime(1969, 12, 31, 23, 59, 59, 500000, tzinfo=UTC)
+    stamps = [start + timedelta(hours=h) for h in range(48)]
+    expected = array('q', [seconds_since_epoch(s) for s in stamps])
+    assert seconds_since_epoch_many(stamps) == expected
+    assert seconds_since_epoch_many(iter(stamps)) == expected
+
+
+def test_days_since_epoch_many():
+    dates = [date(1969, 12, 31) + timedelta(days=d) for d in range(400)]
+    expected = array('q', [days_since_epoch(d) for d in dates])
+    assert days_since_epoch_many(dates) == expected
+
+
+def test_since_epoch_many_numpy():
+    numpy = pytest.importorskip('numpy')
+    start = datetime(1969, 12, 31, 23, 59, 59, 500000, tzinfo=UTC)
+    stamps = [start + timedelta(hours=h) for h in range(48)]
+    naive = numpy.array([s.replace(tzinfo=None) for s in stamps],
+                        dtype='datetime64[us]')
+    seconds = seconds_since_epoch_many(naive)
+    assert seconds.dtype == numpy.int64
+    assert seconds.tolist() == [seconds_since_epoch(s) for s in stamps]
+    days = days_since_epoch_many(naive.astype('datetime64[D]'))
+    assert days.tolist() == [days_since_epoch(s.date()) for s in stamps]
+
+
+def test_bucketize():
+    stamps = [datetime(2015, 6, 14, 23, tzinfo=UTC),
+              datetime(2015, 6, 15, 1),
+              date(2015, 7, 1),
+              1434326400.5]
+    days = bucketize(stamps)
+    assert list(days) == [16600, 16601, 16617, 16601]
+    assert [bucket_start(d) for d in days] == [
+        date(2015, 6, 14), date(2015, 6, 15), date(2015, 7, 1),
+        date(2015, 6, 15)]
+    weeks = bucketize(stamps, 'week')
+    assert [bucket_start(w, 'week') for w in weeks] == [
+        date(2015, 6, 8), date(2015, 6, 15), date(2015, 6, 29),
+        date(2015, 6, 15)]
+    months = bucketize(stamps, 'month')
+    assert [bucket_start(m, 'month') for m in months] == [
+        date(2015, 6, 1), date(2015, 6, 1), date(2015, 7, 1),
+        date(2015, 6, 1)]
+    with pytest.raises(ValueError):
+        bucketize(stamps, 'year')
+
+
+def test_bucketize_time_zones():
+    # 03:30 UTC is still the previous day in New York, across the
+    # daylight saving change of 2015-03-08.
+    stamps = [datetime(2015, 3, 8, 3, 30, tzinfo=UTC),
+              datetime(2015, 3, 9, 3, 30, tzinfo=UTC),
+              datetime(1801, 1, 1, 3, 30, tzinfo=UTC)]
+    days = bucketize(stamps, tz='America/New_York')
+    assert [bucket_start(d) for d in days] == [
+        date(2015, 3, 7), date(2015, 3, 8), date(1800, 12, 31)]
+    assert list(bucketize(stamps, 'month', tz='America/New_York')) == [
+        542, 542, -2029]
+
+
+def test_bucketize_numpy():
+    numpy = pytest.importorskip('numpy')
+    seconds = numpy.arange(-10 ** 9, 3 * 10 ** 9, 7777777)
+    stamps = [datetime(1970, 1, 1, tzinfo=UTC) + timedelta(seconds=int(s))
+              for s in seconds]
+    for granularity in ('day', 'week', 'month'):
+        for tz in (None, 'Europe/London'):
+            expected = list(bucketize(stamps, granularity, tz=tz))
+            assert bucketize(seconds, granularity, tz=tz).tolist() == expected
+            as_datetime64 = seconds.astype('datetime64[s]')
+            assert bucketize(
+                as_datetime64, granularity, tz=tz).tolist() == expected
+
+
+def test_aggregate_buckets():
+    assert aggregate_buckets([3, 3, 4]) == {3: 2, 4: 1}
+    assert aggregate_buckets([3, 3, 4], [1, 2, 5]) == {3: 3, 4: 5}
+    numpy = pytest.importorskip('numpy')
+    ids = numpy.array([3, 3, 4])
+    assert aggregate_buckets(ids) == {3: 2, 4: 1}
+    assert aggregate_buckets(ids, numpy.array([1, 2, 5])) == {3: 3, 4: 5}
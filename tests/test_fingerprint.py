@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from trackmaven_common.fingerprint import (
+    words, simhash, simhash_many, hamming_distance, minhash,
+    minhash_similarity, SimHashIndex, remove_near_duplicates)
+
+
+def naive_simhash(text):
+    """
+    SimHash the slow way, one bit position at a time.
+    """
+    from trackmaven_common.fingerprint import _hash
+    hashes = [_hash(word) for word in words(text)]
+    fingerprint = 0
+    for bit in range(64):
+        if sum((h >> bit) & 1 for h in hashes) * 2 > len(hashes):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def test_words():
+    assert words('Check <b>this</b>  out! http://yolo.co #yoloco') == [
+        'check', 'this', 'out!']
+
+
+def test_simhash_ignores_links_hashtags_and_whitespace():
+    a = simhash('Our spring collection is live! http://bit.ly/x #spring')
+    b = simhash('our spring  collection\nis live!  #new')
+    assert a == b
+    assert 0 <= a < 2 ** 64
+    assert simhash('') == 0
+
+
+def test_simhash_matches_naive():
+    rng = random.Random(0)
+    vocabulary = ['word{0}'.format(i) for i in range(50)]
+    for count in list(range(12)) + [100, 1000]:
+        text = ' '.join(rng.choice(vocabulary) for _ in range(count))
+        assert simhash(text) == naive_simhash(text)
+
+
+def test_simhash_many():
+    texts = ['Big news today', 'Hello there']
+    assert list(simhash_many(texts)) == [simhash(t) for t in texts]
+
+
+def test_hamming_distance():
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(2 ** 64 - 1, 0) == 64
+
+
+def test_minhash():
+    a = minhash('the brand new spring collection is live today')
+    b = minhash('the brand new summer collection is live today')
+    assert len(a) == 64 and all(0 <= value < 2 ** 32 for value in a)
+    assert minhash('Big news #today') == minhash('big  news')
+    # 6 of the 8 distinct words are shared.
+    assert abs(minhash_similarity(a, b) - 0.75) < 0.2
+    assert minhash_similarity(a, a) == 1.0
+    with pytest.raises(ValueError):
+        minhash_similarity(a, minhash('a', permutations=16))
+
+
+@pytest.mark.parametrize('max_distance', [0, 1, 3, 7])
+def test_simhash_index_finds_every_near_fingerprint(max_distance):
+    rng = random.Random(max_distance)
+    fingerprints = [rng.getrandbits(64) for _ in range(500)]
+    fingerprints += [f ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+                     for f in fingerprints[:200]]
+    index = SimHashIndex(max_distance)
+    for key, fingerprint in enumerate(fingerprints):
+        index.add(key, fingerprint)
+    assert len(index) == len(fingerprints)
+    for query in fingerprints[::7]:
+        expected = [key for key, fingerprint in enumerate(fingerprints)
+                    if hamming_distance(query, fingerprint) <= max_distance]
+        found = index.near(query)
+        assert sorted(found) == expected
+        distances = [hamming_distance(query, fingerprints[k]) for k in found]
+        assert distances == sorted(distances)
+
+
+def test_simhash_index_add_and_remove():
+    index = SimHashIndex(max_distance=2)
+    index.add('a', 0b111)
+    index.add('b', 0b100)
+    index.add('a', 0b1000000)
+    assert index.near(0) == ['b', 'a']
+    index.remove('b')
+    assert 'b' not in index
+    assert index.near(0b100) == ['a']
+    with pytest.raises(ValueError):
+        SimHashIndex(max_distance=32)
+
+
+def test_remove_near_duplicates():
+    posts = ['Big news today', 'big news today #launch http://t.co/x',
+             'Hello', 'BIG news\ntoday']
+    assert remove_near_duplicates(posts) == ['Big news today', 'Hello']
+    assert remove_near_duplicates(posts, max_distance=0) == [
+        'Big news today', 'Hello']
@@ -0,0 +1,131 @@
+import sys
+import threading
+import time
+
+import pytest
+
+import trackmaven_common
+from trackmaven_common import instrumentation, lists, text, urls
+
+
+@pytest.fixture(autouse=True)
+def clean_state(request):
+    def clean():
+        instrumentation.disable()
+        instrumentation.reset()
+    instrumentation.reset()
+    request.addfinalizer(clean)
+
+
+def test_enable_and_disable():
+    original = text.clean_string
+    clean_url = urls.clean_url
+    instrumentation.enable(['text'])
+    assert instrumentation.is_enabled()
+    assert text.clean_string is not original
+    assert text.clean_string.__name__ == 'clean_string'
+    assert urls.clean_url is clean_url
+
+    instrumentation.disable()
+    assert not instrumentation.is_enabled()
+    assert text.clean_string is original
+
+
+def test_counts_calls():
+    instrumentation.enable()
+    assert text.clean_string("  a  b ") == 'a b'
+    text.clean_string('c')
+    urls.clean_url('http://google.com/')
+
+    counts = instrumentation.snapshot()
+    assert counts['text.clean_string']['calls'] == 2
+    assert counts['text.clean_string']['sampled'] == 2
+    assert counts['urls.clean_url']['calls'] == 1
+    assert 'text.strip_html' not in counts
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='package exports need Python 3.7+')
+def test_counts_package_exports():
+    instrumentation.enable(['text'])
+    trackmaven_common.clean_string('c')
+    assert instrumentation.snapshot()['text.clean_string']['calls'] == 1
+
+
+def test_times_iterators_as_they_are_consumed():
+    def slow_items():
+        for item in range(3):
+            time.sleep(0.01)
+            yield item
+
+    instrumentation.enable(['lists'])
+    unique = lists.iter_unique(slow_items())
+    assert instrumentation.snapshot()['lists.iter_unique']['sampled'] == 0
+    assert list(unique) == [0, 1, 2]
+    counts = instrumentation.snapshot()['lists.iter_unique']
+    assert counts['calls'] == counts['sampled'] == 1
+    assert counts['total_seconds'] >= 0.03
+
+    chunks = lists.iter_chunks(range(10), 2)
+    next(chunks)
+    chunks.close()
+    assert instrumentation.snapshot()['lists.iter_chunks']['sampled'] == 1
+
+
+def test_counts_calls_from_threads():
+    instrumentation.enable(['text'], sample_rate=0.1)
+
+    def call():
+        for _ in range(1000):
+            text.clean_string('a')
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    instrumentation.snapshot()
+    for thread in threads:
+        thread.join()
+    for _ in range(2):
+        counts = instrumentation.snapshot()['text.clean_string']
+        assert counts['calls'] == 4000
+        assert 395 <= counts['sampled'] <= 400
+
+
+def test_sampling():
+    instrumentation.enable(['text'], sample_rate=0.25)
+    for _ in range(100):
+        text.clean_string('a')
+    counts = instrumentation.snapshot()['text.clean_string']
+    assert counts['calls'] == 100
+    assert counts['sampled'] == 25
+    assert sum(counts['latency_us'].values()) == 25
+
+    with pytest.raises(ValueError):
+        instrumentation.enable(sample_rate=0)
+
+
+def test_input_size_histogram():
+    instrumentation.enable(['text'])
+    for value in ('', 'a', 'ab', 'abc', 'a' * 1000):
+        text.clean_string(value)
+    counts = instrumentation.snapshot()['text.clean_string']
+    assert counts['input_size'] == {1: 2, 2: 1, 4: 1, 1024: 1}
+    assert counts['total_seconds'] > 0
+
+
+def test_counts_survive_disable_until_reset():
+    instrumentation.enable(['text'])
+    text.clean_string('a')
+    instrumentation.disable()
+    text.clean_string('a')
+    assert instrumentation.snapshot(reset=True)['text.clean_string'][
+        'calls'] == 1
+    assert instrumentation.snapshot() == {}
+
+
+def test_metrics():
+    instrumentation.enable(['text'])
+    text.clean_string('abc')
+    metrics = dict(instrumentation.metrics(prefix='app'))
+    assert metrics['app.text.clean_string.calls'] == 1
+    assert metrics['app.text.clean_string.sampled'] == 1
+    assert metrics['app.text.clean_string.input_size.le_4'] == 1
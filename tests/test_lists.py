@@ -1,6 +1,14 @@
-from trackmaven_common.lists import split_every, uniquify
+from trackmaven_common import _parallel
+from trackmaven_common.lists import (
+    split_every, uniquify, iter_unique, BloomFilter, iter_chunks, map_chunks)
+import array
+import os
+import pickle
+import sys
 from datetime import date
 
+import pytest
+
 
 def test_split_every_even():
     split = split_every([1, 2, 3, 4], 2)
@@ -12,6 +20,94 @@ def test_split_every_odd():
     assert split == [[1, 2], [3, 4], [5]]
 
 
+def test_split_every_generator():
+    split = split_every((i for i in range(1, 6)), 2)
+    assert split == [[1, 2], [3, 4], [5]]
+
+
+def test_iter_chunks_is_lazy():
+    read = []
+
+    def rows():
+        for i in range(10):
+            read.append(i)
+            yield i
+
+    chunks = iter_chunks(rows(), 4)
+    assert next(chunks) == [0, 1, 2, 3]
+    assert read == [0, 1, 2, 3]
+    assert list(chunks) == [[4, 5, 6, 7], [8, 9]]
+
+
+def test_iter_chunks_zero_copy():
+    data = bytearray(b'abcde')
+    chunks = list(iter_chunks(data, 2, zero_copy=True))
+    assert [c.tobytes() for c in chunks] == [b'ab', b'cd', b'e']
+    data[0:1] = b'z'
+    assert chunks[0].tobytes() == b'zb'
+
+
+@pytest.mark.skipif(sys.version_info < (3,),
+                    reason="Python 2 arrays don't support memoryview")
+def test_iter_chunks_zero_copy_array():
+    data = array.array('i', range(5))
+    chunks = list(iter_chunks(data, 2, zero_copy=True))
+    assert [c.tolist() for c in chunks] == [[0, 1], [2, 3], [4]]
+    data[0] = 7
+    assert chunks[0][0] == 7
+
+
+def test_map_chunks():
+    futures = pytest.importorskip('concurrent.futures')
+    assert list(map_chunks(sum, range(10), 3)) == [3, 12, 21, 9]
+    assert list(map_chunks(sum, range(10), 3, executor='process', workers=2)) == [3, 12, 21, 9]
+    with futures.ThreadPoolExecutor(2) as pool:
+        assert list(map_chunks(len, range(10), 4, executor=pool)) == [4, 4, 2]
+
+
+def test_map_chunks_bounded():
+    pytest.importorskip('concurrent.futures')
+    read = []
+
+    def rows():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    results = map_chunks(sum, rows(), 10, workers=2, max_in_flight=3)
+    assert next(results) == 45
+    assert len(read) == 30
+
+
+def test_map_chunks_unknown_cpu_count(monkeypatch):
+    pytest.importorskip('concurrent.futures')
+    monkeypatch.setattr(os, 'cpu_count', lambda: None, raising=False)
+    assert _parallel.default_workers() == 1
+    assert list(map_chunks(sum, range(10), 5)) == [10, 35]
+
+
+def test_bloom_filter_mutated_items():
+    seen = BloomFilter(capacity=100)
+    item = {"a": 1}
+    assert seen.add(item) is True
+    assert seen.add({"a": 1}) is False
+    item["a"] = 2
+    assert item not in seen
+    assert {"a": 2} not in seen
+    items = [1]
+    seen.add(items)
+    items.append(2)
+    assert items not in seen
+
+
+def test_bloom_filter_hash_count_is_capped():
+    seen = BloomFilter(capacity=10, error_rate=1e-100)
+    assert seen.hashes == BloomFilter.MAX_HASHES
+    seen.add("a")
+    restored = BloomFilter.from_bytes(seen.to_bytes())
+    assert "a" in restored and "b" not in restored
+
+
 def test_uniquify():
     l = [
         {"a": 1, "b": 2},
@@ -32,3 +128,68 @@ def test_uniquify():
         {"date": date(2014, 1, 1)}
     ]
     assert uniquify(l) == expected
+
+
+def test_uniquify_swapped_values():
+    l = [{"a": 1, "b": 2}, {"a": 2, "b": 1}, {"a": 1}, {"a": "1"}]
+    assert uniquify(l) == l
+
+
+def test_uniquify_nested_values():
+    l = [
+        {"tags": ["#a", "#b"], "meta": {"ids": {1, 2}}},
+        {"meta": {"ids": {2, 1}}, "tags": ["#a", "#b"]},
+        {"tags": ["#b", "#a"], "meta": {"ids": {1, 2}}},
+        {"tags": ("#a", "#b"), "meta": {"ids": {1, 2}}},
+    ]
+    assert uniquify(l) == [l[0], l[2], l[3]]
+
+
+def test_uniquify_equal_values_of_other_types():
+    l = [{"a": 1}, {"a": True}, {"a": 1.0}, {"a": 1.5}, {"a": [1, 2.0]},
+         {"a": [True, 2]}, {"a": "1"}]
+    expected = [{"a": 1}, {"a": 1.5}, {"a": [1, 2.0]}, {"a": "1"}]
+    assert uniquify(l) == expected
+    assert uniquify(l, seen=BloomFilter(capacity=100)) == expected
+
+
+def test_uniquify_key():
+    l = [{"id": 1, "v": 2}, {"id": 2, "v": 2}, {"id": 1, "v": 3}]
+    assert uniquify(l, key=lambda d: d["id"]) == l[:2]
+
+
+def test_iter_unique_is_lazy():
+    rows = iter([{"foo": "bar"}, {"foo": "bar"}, {"foo": "boo"}])
+    unique = iter_unique(rows)
+    assert next(unique) == {"foo": "bar"}
+    assert next(unique) == {"foo": "boo"}
+    assert list(rows) == []
+
+
+def test_bloom_filter():
+    seen = BloomFilter(capacity=1000, error_rate=0.001)
+    for i in range(1000):
+        seen.add({"id": i})
+    assert all({"id": i} in seen for i in range(1000))
+    false_positives = sum({"id": i} in seen for i in range(1000, 11000))
+    assert false_positives < 50
+    assert len(seen) <= 1000
+
+
+def test_bloom_filter_max_bytes():
+    seen = BloomFilter(capacity=1000000, error_rate=0.001, max_bytes=1024)
+    assert len(seen.bits) == 1024
+
+
+def test_uniquify_bloom_filter():
+    l = [{"foo": "bar"}, {"foo": "bar"}, {"foo": "boo"}]
+    seen = BloomFilter(capacity=100)
+    assert uniquify(l, seen=seen) == [{"foo": "bar"}, {"foo": "boo"}]
+
+
+def test_uniquify_bloom_filter_resume():
+    seen = BloomFilter(capacity=100)
+    assert uniquify([{"a": 1}, {"b": [2]}], seen=seen) == [{"a": 1}, {"b": [2]}]
+    for restored in (BloomFilter.from_bytes(seen.to_bytes()),
+                     pickle.loads(pickle.dumps(seen))):
+        assert uniquify([{"b": [2]}, {"c": 3}], seen=restored) == [{"c": 3}]
@@ -0,0 +1,77 @@
+from importlib import import_module
+import subprocess
+import sys
+
+import pytest
+
+import trackmaven_common
+
+# Cumulative ``python -X importtime`` cost of a cold ``import
+# trackmaven_common``, in microseconds. It is well under a millisecond
+# today; the budget leaves room for slow machines, not for new imports.
+IMPORT_BUDGET = 20000
+
+# Importing helpers from the package needs module ``__getattr__``, and the
+# import time budget ``-X importtime``, both Python 3.7+.
+requires_py37 = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason='requires Python 3.7+')
+
+HEAVY_MODULES = ('bs4', 'lxml', 'arrow', 'dateutil', 'pytz', 'numpy',
+                 'concurrent.futures', 'trackmaven_common.dates',
+                 'trackmaven_common.lists', 'trackmaven_common.text',
+                 'trackmaven_common.urls')
+
+
+def cold_import(code):
+    """
+    Runs ``code`` in a fresh interpreter, returning what it prints and the
+    cumulative import time of every module it imported.
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return stdout, times
+
+
+@requires_py37
+def test_import_is_lazy_and_within_budget():
+    stdout, times = cold_import(
+        'import sys, trackmaven_common; '
+        'print(" ".join(m for m in %r if m in sys.modules))'
+        % (HEAVY_MODULES,))
+    assert stdout.strip() == ''
+    assert times['trackmaven_common'] < IMPORT_BUDGET
+
+
+@requires_py37
+def test_helper_imports_only_its_module():
+    stdout, _ = cold_import(
+        'import sys; from trackmaven_common import get_index; '
+        'print(" ".join(m for m in %r if m in sys.modules))'
+        % (HEAVY_MODULES,))
+    assert stdout.split() == ['trackmaven_common.lists']
+
+
+@requires_py37
+@pytest.mark.parametrize('module,names',
+                         sorted(trackmaven_common._EXPORTS.items()))
+def test_exports(module, names):
+    module = import_module('trackmaven_common.' + module)
+    for name in names:
+        assert getattr(trackmaven_common, name) is getattr(module, name)
+
+
+@requires_py37
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        trackmaven_common.no_such_helper
+    assert 'get_index' in dir(trackmaven_common)
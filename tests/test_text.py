@@ -1,6 +1,20 @@
 from trackmaven_common.text import (
-    humanize_join, strip_all_tags, truncate_string,  remove_words_from_text,
-    extract_text_from_dict, extract_links, extract_hashtags, extract_raw_text)
+    clean_string, strip_html, humanize_join, strip_all_tags, truncate_string,
+    remove_words_from_text, extract_text_from_dict, extract_links,
+    extract_hashtags, extract_raw_text, clean_string_many, extract_links_many,
+    extract_hashtags_many, extract_raw_text_many, parse_text, parse_text_many,
+    WordMatcher, WordMatch, iter_clean_string, clean_and_truncate,
+    extract_entities, extract_entities_many, Entity, compile_text_extractor,
+    TextExtractor)
+from bs4 import BeautifulSoup
+import glob
+import io
+import os
+import pickle
+import pytest
+
+HTML_FIXTURES = sorted(glob.glob(
+    os.path.join(os.path.dirname(__file__), 'fixtures', 'html', '*.html')))
 
 
 def test_truncate_string():
@@ -14,6 +28,50 @@ def test_truncate_string():
     assert truncate_string(None, 30) is None
 
 
+def test_truncate_string_whole_words():
+    long_string = "A long string that needs to be truncate"
+    assert truncate_string(long_string, 12, whole_words=True) == "A long..."
+    assert truncate_string(long_string, 16, whole_words=True) == (
+        "A long string...")
+    assert truncate_string("Truncated", 6, whole_words=True) == "Tru..."
+
+
+def test_iter_clean_string():
+    text = u"  I am \n MES\r\nSY\t  and  \n clean   "
+    chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+    assert "".join(iter_clean_string(chunks)) == clean_string(text)
+    assert "".join(iter_clean_string(io.StringIO(text), chunk_size=2)) == (
+        clean_string(text))
+    assert "".join(iter_clean_string(text)) == clean_string(text)
+
+
+def test_clean_and_truncate_stops_reading():
+    def chunks():
+        yield "  A long \n string that "
+        yield "needs to be truncate  "
+        raise AssertionError("Read past the truncation point")
+
+    assert clean_and_truncate(chunks(), 12) == "A long st..."
+    assert clean_and_truncate(chunks(), 12, whole_words=True) == "A long..."
+
+
+def test_iter_clean_string_memory_is_bounded():
+    tracemalloc = pytest.importorskip('tracemalloc')
+    chunk = "lorem  ipsum\n dolor " * 500
+
+    def peak_memory(count):
+        tracemalloc.start()
+        try:
+            for _ in iter_clean_string(chunk for _ in range(count)):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Cleaning 20 times as much text takes no more memory.
+    assert peak_memory(100) < 1.5 * peak_memory(5)
+
+
 def test_humanize_join():
     """Test truncate_string correctly shortens strings"""
     names = ['Cam', 'Jon', 'Fred', 'Fletcher', 'Matt', 'Josh', 'John']
@@ -123,6 +181,54 @@ def test_remove_words_from_text():
     assert 'wow' == remove_words_from_text(text, items_to_remove)
 
 
+def test_remove_phrases_from_text():
+    banned = ["ice cream", "ice cream cones", "don't", "cones"]
+    text = "I don't like ice cream cones or ice cream or ice"
+    assert remove_words_from_text(text, banned) == "I like or or ice"
+    assert remove_words_from_text(text, WordMatcher(banned)) == (
+        "I like or or ice")
+
+
+def test_word_matcher_find():
+    matcher = WordMatcher(["#yolo", "google dot com", "google"])
+    text = "wow #yolo  google dot com google dot"
+    assert matcher.find(text) == [
+        WordMatch('#yolo', 4, 9),
+        WordMatch('google dot com', 11, 25),
+        WordMatch('google', 26, 32)]
+    assert matcher.search(text) == WordMatch('#yolo', 4, 9)
+    assert matcher.search("nothing to see") is None
+
+
+def test_word_matcher_pickles():
+    matcher = WordMatcher(["ice cream", "cones"])
+    text = "ice cream cones and ice"
+    assert pickle.loads(pickle.dumps(matcher)).remove(text) == "and ice"
+
+
+def test_extract_entities():
+    text = ("$AAPL is up, ask @fred or fred.smith@example.com and see "
+            "http://trackmaven.com/#blog #stocks $BRK.B.")
+    entities = extract_entities(text)
+    assert [(e.type, e.text) for e in entities] == [
+        ('cashtag', '$AAPL'),
+        ('mention', '@fred'),
+        ('email', 'fred.smith@example.com'),
+        ('link', 'http://trackmaven.com/#blog'),
+        ('hashtag', '#stocks'),
+        ('cashtag', '$BRK.B')]
+    assert all(text[e.start:e.end] == e.text for e in entities)
+    assert extract_entities("price $5, a@b, localhost:8000") == [
+        Entity('link', 'localhost:8000', 15, 29)]
+    assert extract_entities("") == []
+
+
+def test_extract_entities_many():
+    texts = ["#a @b", "nothing", "$C"]
+    assert list(extract_entities_many(texts)) == [
+        extract_entities(text) for text in texts]
+
+
 def test_extract_raw_text():
     """
     Tests extracting raw text (no html, links or hashtags) from a text
@@ -130,3 +236,174 @@ def test_extract_raw_text():
     """
     text = "<b>This</b> is #awesome http://goog.co www.google.com"
     assert 'This is' == extract_raw_text(text)
+
+
+def test_strip_all_tags_matches_sequential_passes():
+    """
+    Test that strip_all_tags gives the same output as running the three
+    tag-stripping substitutions one after another.
+    """
+    import re
+
+    def sequential(string):
+        string = re.sub(r'<[^<>]*?>', "", string)
+        string = re.sub(r'<[^\s0-9].*', "", string)
+        return re.sub(r'.*[^\s0-9]>', "", string)
+
+    samples = [
+        "plain text with no tags",
+        "a<b>>c",
+        "<<b>x",
+        "x > y\nfoo/> bar\n1> 2",
+        "line one <i\nline two> three",
+        "<p>one</p>\n<p>two</p> a> b> c",
+        "I <3 you > me",
+    ]
+    for sample in samples:
+        assert sequential(sample) == strip_all_tags(sample)
+
+
+def test_extract_many_is_lazy():
+    """
+    Test that the batch helpers consume their input as results are read.
+    """
+    consumed = []
+
+    def posts():
+        for post in ["#a http://a.com", "b #c", "  d  "]:
+            consumed.append(post)
+            yield post
+
+    results = extract_hashtags_many(posts())
+    assert consumed == []
+    assert next(results) == ['#a']
+    assert len(consumed) == 1
+    assert list(results) == [['#c'], []]
+
+
+def test_extract_many_matches_single():
+    """
+    Test that the batch helpers match their single string counterparts,
+    both in process and across a process pool.
+    """
+    posts = ["<b>This</b> is #awesome http://goog.co", "  I am\n MESSY  "] * 5
+    assert list(extract_links_many(posts)) == [extract_links(p) for p in posts]
+    assert list(clean_string_many(posts)) == [clean_string(p) for p in posts]
+    expected = [extract_raw_text(p) for p in posts]
+    assert list(extract_raw_text_many(posts)) == expected
+    assert list(extract_raw_text_many(posts, processes=2, chunksize=3)) == expected
+
+
+def test_extract_many_reuses_an_executor():
+    futures = pytest.importorskip('concurrent.futures')
+    posts = ["<b>This</b> is #awesome http://goog.co", "  I am\n MESSY  "] * 5
+    expected = [extract_raw_text(p) for p in posts]
+    with futures.ProcessPoolExecutor(2) as pool:
+        for _ in range(2):
+            assert list(extract_raw_text_many(
+                posts, chunksize=3, executor=pool)) == expected
+        assert list(clean_string_many(
+            posts, processes=2, executor=pool)) == [
+                clean_string(p) for p in posts]
+
+
+def test_parse_text():
+    """
+    Tests that parse_text returns the raw text, links and hashtags of a
+    text string together.
+    """
+    text = "<b>This</b> is #awesome http://goog.co www.google.com"
+    parsed = parse_text(text)
+    assert parsed.raw_text == 'This is'
+    assert parsed.links == ['http://goog.co', 'www.google.com']
+    assert parsed.hashtags == ['#awesome']
+    assert parsed.raw_text == extract_raw_text(text)
+
+
+def test_parse_text_many():
+    """
+    Tests that parse_text_many yields the same results as parse_text.
+    """
+    posts = ["wow #yolo http://www.google.com", "no links here", ""]
+    assert list(parse_text_many(posts)) == [parse_text(p) for p in posts]
+
+
+@pytest.mark.parametrize('backend', ['stream', 'lxml', 'bs4'])
+@pytest.mark.parametrize('path', HTML_FIXTURES)
+def test_strip_html_backends(path, backend):
+    """
+    Test that every HTML backend extracts the same text from the fixture
+    corpus as BeautifulSoup.
+    """
+    with io.open(path, encoding='utf-8') as fd:
+        html = fd.read()
+    expected = BeautifulSoup(html, 'html.parser').get_text().strip()
+    assert strip_html(html, backend=backend) == expected
+
+
+def test_strip_html_stream_matches_beautifulsoup():
+    """
+    Test that the streaming backend handles entities, whitespace, comments
+    and non-text tags the same way BeautifulSoup does.
+    """
+    samples = [
+        "<b>  A string  </b>",
+        "a &amp; b &foo; &#147;quoted&#x2019; &#99999999;",
+        "<p>a</p>\n  \n<p>b</p><pre>  \n </pre>",
+        "<script>var x = '<b>';</script>hi<style>p {}</style>",
+        "<template><p>t</p></template><!-- c --><![CDATA[ cd ]]>x",
+        "<br>  </br>  x<div><template>a</div>b",
+        "text <a href=",
+    ]
+    for sample in samples:
+        expected = BeautifulSoup(sample, 'html.parser').get_text().strip()
+        assert strip_html(sample) == expected
+
+
+def test_strip_html_unknown_backend():
+    with pytest.raises(ValueError):
+        strip_html("<b>bold</b>", backend='regex')
+
+
+def test_compile_text_extractor():
+    extractor = compile_text_extractor(
+        ['title', 'author.profile.bio', 'tags[0]', 'tags[-1]', 'views',
+         'missing.key', 'title.key', 'tags[5]', 'author.name'])
+    doc = {
+        'title': 'Hello',
+        'author': {'profile': {'bio': 'Cat person'}, 'name': ''},
+        'tags': ['a', 'b', 3],
+        'views': 10,
+    }
+    assert extractor(doc) == 'Hello Cat person a 3 10'
+    assert extractor({}) == ''
+    assert extractor(None) == ''
+
+    extractor = compile_text_extractor(['a', 'b'])
+    assert list(extractor.many([{'a': 'x', 'b': 'y'}, {'b': 'z'}])) == [
+        'x y', 'z']
+    assert extractor({'a': 1}) == extract_text_from_dict({'a': 1}, ['a', 'b'])
+
+
+@pytest.mark.parametrize('path,steps', [
+    ('a', ('a',)),
+    ('author.profile.bio', ('author', 'profile', 'bio')),
+    ('items[-1].name', ('items', -1, 'name')),
+    ('matrix[0][1]', ('matrix', 0, 1)),
+    ('[0].a', (0, 'a')),
+])
+def test_text_extractor_paths(path, steps):
+    assert TextExtractor([path])._steps == [steps]
+
+
+@pytest.mark.parametrize('path', ['', '.a', 'a.', 'a..b', 'a[x]', 'a[0',
+                                  'a]', 'a[0]b'])
+def test_text_extractor_invalid_paths(path):
+    with pytest.raises(ValueError):
+        TextExtractor([path])
+
+
+def test_text_extractor_pickles():
+    extractor = pickle.loads(pickle.dumps(TextExtractor(['a.b'])))
+    assert list(extractor.many([{'a': {'b': 'c'}}] * 3, processes=2)) == [
+        'c'] * 3
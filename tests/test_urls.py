@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from trackmaven_common.urls import (
-    httpsify, parse_domain, clean_url, validate_url)
+    httpsify, parse_domain, clean_url, validate_url, configure_url_cache,
+    url_cache_info, clear_url_cache, URL_CACHE_SIZE, normalize_url,
+    normalize_many, group_by_domain, effective_domain, public_suffix)
 import pytest
 
 
@@ -52,3 +54,105 @@ def test_validate_url_invalid():
     with pytest.raises(ValueError) as exc:
         validate_url('_rackmaven.c1m/')
     assert str(exc.value) == "Enter a valid URL."
+
+
+def test_url_cache_hits():
+    clear_url_cache()
+    for _ in range(3):
+        assert clean_url('www.trackmaven.com') == 'http://www.trackmaven.com/'
+        with pytest.raises(ValueError):
+            validate_url('_rackmaven.c1m/')
+    info = url_cache_info()
+    assert (info['clean_url'].hits, info['clean_url'].misses) == (2, 1)
+    assert (info['validate_url'].hits, info['validate_url'].misses) == (2, 1)
+
+
+def test_url_cache_disabled():
+    configure_url_cache(0)
+    try:
+        assert url_cache_info() == {}
+        assert parse_domain('http://www.google.com') == 'google.com'
+        assert clean_url('www.trackmaven.com') == 'http://www.trackmaven.com/'
+    finally:
+        configure_url_cache(URL_CACHE_SIZE)
+
+
+def test_normalize_url():
+    record = normalize_url(' www.trackmaven.com/blog ')
+    assert record.normalized == clean_url(' www.trackmaven.com/blog ')
+    assert record.valid
+    assert record.domain == 'trackmaven.com'
+
+
+def test_normalize_url_invalid():
+    assert not normalize_url('_rackmaven.c1m/').valid
+    record = normalize_url('http://[trackmaven.com')
+    assert (record.normalized, record.valid, record.domain) == (None, False, None)
+    record = normalize_url('ftp:////[x')
+    assert (record.normalized, record.valid, record.domain) == (None, False, None)
+
+
+def test_normalize_url_domain_matches_parse_domain():
+    for url in ('http:////example.com/path', 'www.google.com/maps',
+                'ftp://files.trackmaven.com/a'):
+        record = normalize_url(url)
+        assert record.domain == parse_domain(clean_url(url))
+    assert normalize_url('http:////example.com/path').domain == 'example.com'
+
+
+def test_normalize_many():
+    urls = ['www.google.com', 'http://[bad', 'ftp://files.trackmaven.com/a']
+    assert list(normalize_many(urls)) == [normalize_url(u) for u in urls]
+    assert list(normalize_many(urls, processes=2)) == [normalize_url(u) for u in urls]
+
+
+def test_group_by_domain():
+    urls = ['www.google.com', 'trackmaven.com/blog', 'google.com/maps',
+            '_rackmaven.c1m/', 'http://[bad']
+    domains, invalid = group_by_domain(urls)
+    assert domains == {
+        'google.com': ['http://www.google.com/', 'http://google.com/maps'],
+        'trackmaven.com': ['http://trackmaven.com/blog'],
+    }
+    assert invalid == ['_rackmaven.c1m/', 'http://[bad']
+
+
+def test_effective_domain():
+    assert effective_domain('http://blog.foo.co.uk/posts') == 'foo.co.uk'
+    assert effective_domain('foo.co.uk') == 'foo.co.uk'
+    assert effective_domain('http://user@WWW.Google.COM:8080/') == 'google.com'
+    assert effective_domain('co.uk') is None
+    assert effective_domain('192.168.0.1') == '192.168.0.1'
+    assert effective_domain('.com') is None
+    assert effective_domain('foo..com') is None
+
+
+def test_public_suffix():
+    assert public_suffix('http://blog.foo.co.uk/posts') == 'co.uk'
+    assert public_suffix('192.168.0.1') is None
+    assert public_suffix('http://[::1]/') is None
+    assert public_suffix('.com') is None
+
+
+def test_effective_domain_wildcard_and_exception_rules():
+    # The list has *.kawasaki.jp with an exception for city.kawasaki.jp.
+    assert effective_domain('x.kawasaki.jp') is None
+    assert effective_domain('y.x.kawasaki.jp') == 'y.x.kawasaki.jp'
+    assert effective_domain('a.b.city.kawasaki.jp') == 'city.kawasaki.jp'
+
+
+def test_effective_domain_private_suffixes():
+    assert effective_domain('trackmaven.github.io') == 'github.io'
+    assert effective_domain('trackmaven.github.io', private=True) == 'trackmaven.github.io'
+    assert public_suffix('trackmaven.github.io', private=True) == 'github.io'
+
+
+def test_group_by_domain_effective():
+    urls = ['blog.foo.co.uk', 'foo.co.uk/about', 'www.google.com',
+            'http://awww.com/x']
+    domains, invalid = group_by_domain(urls, effective=True)
+    assert domains == {
+        'foo.co.uk': ['http://blog.foo.co.uk/', 'http://foo.co.uk/about'],
+        'google.com': ['http://www.google.com/'],
+        'awww.com': ['http://awww.com/x'],
+    }
@@ -1,2 +1,60 @@
 __version__ = '1.0.1'
 __version_info__ = tuple(int(i) for i in __version__.split('.'))
+
+# The helpers can be imported straight from the package, e.g.
+# ``from trackmaven_common import get_index``. A module is only imported
+# the first time one of its helpers is asked for, so importing the package
+# doesn't import BeautifulSoup, dateutil or pytz. Python 2 doesn't support
+# module ``__getattr__``, so there the helpers have to be imported from
+# their modules.
+_EXPORTS = {
+    'aio': (),
+    'dates': (
+        'today', 'now', 'last_week', 'last_month', 'seconds_since_epoch',
+        'days_since_epoch', 'seconds_since_epoch_many',
+        'days_since_epoch_many', 'bucketize', 'bucket_start',
+        'aggregate_buckets', 'iso_to_utc', 'get_timezone', 'to_timezone',
+        'to_timezone_many', 'iso_to_timezone', 'iso_to_timezone_many',
+        'daily_date_range', 'DateRange', 'date_key_to_iso', 'force_to_date'),
+    'fingerprint': (),
+    'instrumentation': (),
+    'lists': (
+        'split_every', 'iter_chunks', 'map_chunks', 'uniquify',
+        'iter_unique', 'BloomFilter', 'get_index'),
+    'text': (
+        'clean_string', 'truncate_string', 'iter_clean_string',
+        'clean_and_truncate', 'strip_html', 'strip_all_tags',
+        'WordMatch', 'WordMatcher', 'remove_words_from_text',
+        'extract_links', 'extract_hashtags', 'Entity', 'extract_entities',
+        'extract_entities_many', 'ParsedText', 'parse_text',
+        'extract_raw_text', 'clean_string_many', 'extract_links_many',
+        'extract_hashtags_many', 'extract_raw_text_many', 'parse_text_many',
+        'extract_text_from_dict', 'compile_text_extractor',
+        'TextExtractor', 'humanize_join'),
+    'urls': (
+        'httpsify', 'parse_domain', 'clean_url', 'validate_url',
+        'effective_domain', 'public_suffix', 'UrlRecord', 'normalize_url',
+        'normalize_many', 'group_by_domain', 'configure_url_cache',
+        'url_cache_info', 'clear_url_cache'),
+}
+
+_MODULES = dict((name, module)
+                for module, names in _EXPORTS.items() for name in names)
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    from importlib import import_module
+    if name in _EXPORTS:
+        return import_module('.' + name, __name__)
+    if name not in _MODULES:
+        raise AttributeError(
+            'module {0!r} has no attribute {1!r}'.format(__name__, name))
+    # Looked up on every access rather than stored in the package, so that
+    # patching a helper in its module is seen here too.
+    return getattr(import_module('.' + _MODULES[name], __name__), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_MODULES))
@@ -0,0 +1,227 @@
+"""
+HTML to text backends used by `trackmaven_common.text.strip_html`.
+
+Every backend returns the concatenated text of a document, leaving out
+comments, declarations and the contents of ``<script>``, ``<style>`` and
+``<template>`` tags, the same way ``BeautifulSoup.get_text()`` does.
+"""
+try:
+    from html.entities import codepoint2name
+    from html.parser import HTMLParser
+except ImportError:
+    from htmlentitydefs import codepoint2name
+    from HTMLParser import HTMLParser
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+
+# Tags whose strings are not considered text.
+STRING_CONTAINERS = frozenset(['script', 'style', 'template'])
+# Tags inside which whitespace-only strings are kept as is.
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+# Tags that never have contents, so never need an end tag.
+EMPTY_ELEMENT_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid',
+    'spacer'])
+
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# The HTML 4 named entities, plus &apos;.
+ENTITIES = dict((name, unichr(codepoint))
+                for codepoint, name in codepoint2name.items())
+ENTITIES['apos'] = "'"
+
+# The lxml.etree and lxml.html modules, once `lxml_modules` has imported
+# them (or Nones if lxml isn't installed).
+_lxml = []
+
+
+class TextParser(HTMLParser):
+    """
+    A streaming tokenizer that collects the text of a document without
+    building a tree.
+
+    The events are handled exactly as BeautifulSoup's ``html.parser``
+    builder handles them, so the collected text is the same as
+    ``BeautifulSoup(string, 'html.parser').get_text()``: runs of whitespace
+    between tags collapse to a single space or newline, numeric references
+    below 256 are read as Windows-1252 and unknown entities are kept as
+    written.
+    """
+
+    def __init__(self):
+        try:
+            HTMLParser.__init__(self, convert_charrefs=False)
+        except TypeError:
+            HTMLParser.__init__(self)
+        self.text = []
+        self._data = []
+        self._open_tags = []
+        self._closed_empty_elements = []
+        self._containers = 0
+        self._preserving = 0
+
+    def _flush(self, keep=True):
+        if not self._data:
+            return
+        data = ''.join(self._data)
+        self._data = []
+        if not keep or self._containers:
+            return
+        if not self._preserving and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        self.text.append(data)
+
+    def _push(self, name):
+        self._open_tags.append(name)
+        if name in STRING_CONTAINERS:
+            self._containers += 1
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self._preserving += 1
+
+    def _pop_to(self, name):
+        if name not in self._open_tags:
+            return
+        while True:
+            popped = self._open_tags.pop()
+            if popped in STRING_CONTAINERS:
+                self._containers -= 1
+            if popped in PRESERVE_WHITESPACE_TAGS:
+                self._preserving -= 1
+            if popped == name:
+                return
+
+    def handle_starttag(self, name, attrs, empty_element=True):
+        self._flush()
+        self._push(name)
+        if empty_element and name in EMPTY_ELEMENT_TAGS:
+            self.handle_endtag(name, check_already_closed=False)
+            self._closed_empty_elements.append(name)
+
+    def handle_startendtag(self, name, attrs):
+        self.handle_starttag(name, attrs, empty_element=False)
+        self.handle_endtag(name)
+
+    def handle_endtag(self, name, check_already_closed=True):
+        if check_already_closed and name in self._closed_empty_elements:
+            self._closed_empty_elements.remove(name)
+            return
+        self._flush()
+        self._pop_to(name)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        if name[0] in 'xX':
+            codepoint = int(name.lstrip(name[0]), 16)
+        else:
+            codepoint = int(name)
+        data = None
+        if codepoint < 256:
+            try:
+                data = bytearray([codepoint]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = unichr(codepoint)
+            except (ValueError, OverflowError):
+                pass
+        self._data.append(data or u'\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        self._data.append(ENTITIES.get(name, '&' + name))
+
+    def _discard(self, data):
+        self._flush()
+        self._data.append(data)
+        self._flush(keep=False)
+
+    handle_comment = handle_decl = handle_pi = _discard
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            self._flush()
+            self._data.append(data[len('CDATA['):])
+            self._flush()
+        else:
+            self._discard(data)
+
+    def close(self):
+        HTMLParser.close(self)
+        self._flush()
+
+
+def stream_text(string):
+    """
+    Returns the text of an HTML string using the streaming `TextParser`.
+    """
+    parser = TextParser()
+    parser.feed(string)
+    parser.close()
+    return ''.join(parser.text)
+
+
+def lxml_modules():
+    """
+    Returns the ``lxml.etree`` and ``lxml.html`` modules, or Nones if lxml
+    isn't installed. lxml is imported the first time this is called.
+    """
+    if not _lxml:
+        try:
+            from lxml import etree
+            import lxml.html
+            _lxml.extend([etree, lxml.html])
+        except ImportError:
+            _lxml.extend([None, None])
+    return tuple(_lxml)
+
+
+def lxml_text(string):
+    """
+    Returns the text of an HTML string using lxml.
+    """
+    lxml_etree, lxml_html = lxml_modules()
+    try:
+        root = lxml_html.document_fromstring(string)
+    except lxml_etree.ParserError:
+        # Raised for documents with nothing but whitespace in them.
+        return ''
+    text = root.xpath(
+        '//text()[not(ancestor::script or ancestor::style'
+        ' or ancestor::template)]')
+    for index, data in enumerate(text):
+        # Whitespace-only strings collapse like `TextParser._flush` does.
+        if not data.strip(ASCII_SPACES) and not _preserved(data):
+            text[index] = '\n' if '\n' in data else ' '
+    return ''.join(text)
+
+
+def _preserved(data):
+    """
+    Returns whether a text node found by lxml is inside a tag in which
+    whitespace is kept as is.
+    """
+    element = data.getparent()
+    if data.is_tail:
+        element = element.getparent()
+    while element is not None:
+        if element.tag in PRESERVE_WHITESPACE_TAGS:
+            return True
+        element = element.getparent()
+    return False
+
+
+def bs4_text(string):
+    """
+    Returns the text of an HTML string using BeautifulSoup with the best
+    parser installed.
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(string).get_text()
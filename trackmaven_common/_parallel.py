@@ -0,0 +1,101 @@
+"""
+Internal helpers for fanning work out across a pool of workers.
+"""
+from collections import deque
+from functools import partial
+from itertools import islice
+import os
+
+
+def _apply(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def chunks(iterable, size):
+    """
+    Lazily yields lists of up to ``size`` items of an iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def executor_class(kind):
+    """
+    Returns the executor class for ``'thread'`` or ``'process'``.
+    concurrent.futures is only imported once a pool is needed.
+    """
+    try:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    except ImportError:
+        # Python 2 without the ``futures`` backport installed.
+        raise RuntimeError(
+            'Parallel processing requires concurrent.futures, install the '
+            '"futures" package on Python 2.')
+    classes = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+    if kind not in classes:
+        raise ValueError(
+            "Unknown executor %r, expected 'thread' or 'process'" % (kind,))
+    return classes[kind]
+
+
+def default_workers():
+    # os.cpu_count() is None when the count can't be determined.
+    return (os.cpu_count() if hasattr(os, 'cpu_count') else None) or 1
+
+
+def bounded_map(func, items, executor, max_in_flight):
+    """
+    Lazily yields ``func(item)`` for every item, in order, computed by
+    ``executor``. At most ``max_in_flight`` items are submitted but not yet
+    yielded, so ``items`` is only read as fast as results are consumed.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def imap(func, iterable, processes=None, chunksize=256, executor=None):
+    """
+    Lazily yields ``func(item)`` for every item of ``iterable``, in order.
+
+    Runs in the calling process unless ``processes`` is given, in which case
+    the items are sent to a pool of that many worker processes in chunks of
+    ``chunksize``. Only ``2 * processes`` chunks are in flight at once, so
+    the input is consumed as fast as the results are, not all up front.
+    ``func`` must be picklable (i.e. a module level function) to be sent to
+    a worker process.
+
+    An existing ``executor`` is used instead of starting (and shutting
+    down) a pool for the call, with ``processes`` as the number of its
+    workers (by default one per CPU).
+    """
+    if executor is not None:
+        return _executor_imap(func, iterable, executor,
+                              processes or default_workers(), chunksize)
+    if not processes:
+        return (func(item) for item in iterable)
+    return _pool_imap(
+        func, iterable, executor_class('process'), processes, chunksize)
+
+
+def _pool_imap(func, iterable, pool_class, processes, chunksize):
+    with pool_class(max_workers=processes) as pool:
+        for result in _executor_imap(func, iterable, pool, processes,
+                                     chunksize):
+            yield result
+
+
+def _executor_imap(func, iterable, executor, workers, chunksize):
+    results = bounded_map(partial(_apply, func), chunks(iterable, chunksize),
+                          executor, 2 * workers)
+    for chunk in results:
+        for result in chunk:
+            yield result
@@ -0,0 +1,251 @@
+"""
+Async counterparts of the CPU heavy helpers, for asyncio services: the work
+runs in a pool of worker processes (or threads) so that it doesn't block
+the event loop. Python 3.5+ only.
+
+Small inputs are sent to the pool in batches, so the cost of a round trip
+to a worker is shared by many calls, and the number of batches running and
+calls waiting are bounded, so a burst of calls waits for the pool to catch
+up instead of piling up in memory.
+
+Example:
+
+>>> from trackmaven_common import aio
+>>> async def handle(page):
+...     return await aio.extract_raw_text(await aio.strip_html(page))
+"""
+import asyncio
+from collections import deque
+from functools import partial
+
+from . import text, urls
+from ._parallel import chunks, default_workers, executor_class
+
+# The offloader made by `default_offloader`, once it has been asked for.
+_default = []
+# (function, keyword arguments): the partial `_partial` made for them.
+_partials = {}
+
+
+def _call_each(func, items):
+    """
+    Returns ``(True, func(item))`` or ``(False, error)`` for every item, so
+    that one bad input fails its own call and not its whole batch.
+    """
+    results = []
+    for item in items:
+        try:
+            results.append((True, func(item)))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+
+def _unwrap(result):
+    succeeded, value = result
+    if not succeeded:
+        raise value
+    return value
+
+
+class _Batch(object):
+
+    def __init__(self, loop):
+        self.items = []
+        self.future = loop.create_future()
+        self.timer = None
+
+
+class Offloader(object):
+    """
+    Runs functions of one argument in a pool of ``workers`` processes (or
+    threads, for ``kind='thread'``), from coroutines.
+
+    Calls to `run` with the same function are gathered into batches of up
+    to ``batch_size`` items, each sent once it is full or ``batch_wait``
+    seconds after its first item. At most ``workers`` batches run at once,
+    and `run` waits once ``max_pending`` calls are already queued. Functions
+    and items are pickled to be sent to worker processes, so functions must
+    be defined at module level (or be partials of them).
+
+    Example:
+
+    >>> offloader = Offloader(workers=4)
+    >>> await offloader.run(text.strip_html, "<p>Hi</p>")
+    "Hi"
+    >>> await offloader.map(text.strip_html, ["<p>Hi</p>", "<b>there</b>"])
+    ["Hi", "there"]
+    >>> offloader.close()
+    """
+
+    def __init__(self, kind='process', workers=None, batch_size=32,
+                 batch_wait=0.002, max_pending=None):
+        self.kind = kind
+        self.workers = workers or default_workers()
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_pending = max_pending or 4 * self.workers * batch_size
+        self._executor_class = executor_class(kind)
+        self._pool = None
+        # asyncio primitives belong to one event loop, so they are made by
+        # `_bind` for the loop the offloader is used from.
+        self._loop = None
+
+    def _bind(self):
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = asyncio.Semaphore(self.max_pending)
+            self._running = asyncio.Semaphore(self.workers)
+            self._batches = {}
+            # The loop only keeps weak references to tasks.
+            self._tasks = set()
+        if self._pool is None:
+            self._pool = self._executor_class(max_workers=self.workers)
+        return loop
+
+    async def run(self, func, item):
+        """
+        Returns ``func(item)``, computed in the pool.
+        """
+        loop = self._bind()
+        await self._pending.acquire()
+        try:
+            batch = self._batches.get(func)
+            if batch is None:
+                batch = self._batches[func] = _Batch(loop)
+                batch.timer = loop.call_later(
+                    self.batch_wait, self._flush, func, batch)
+            index = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.batch_size:
+                self._flush(func, batch)
+            results = await asyncio.shield(batch.future)
+        finally:
+            self._pending.release()
+        return _unwrap(results[index])
+
+    async def map(self, func, items):
+        """
+        Returns the list of ``func(item)`` for every item, computed in the
+        pool in batches of ``batch_size``. Like `run`, no more than
+        ``max_pending`` items are read ahead of the results.
+        """
+        self._bind()
+        window = max(1, self.max_pending // self.batch_size)
+        batches = deque()
+        results = []
+        try:
+            for chunk in chunks(items, self.batch_size):
+                batches.append(asyncio.ensure_future(self._call(func, chunk)))
+                if len(batches) >= window:
+                    results.extend(await batches.popleft())
+            while batches:
+                results.extend(await batches.popleft())
+        finally:
+            for batch in batches:
+                batch.cancel()
+        return [_unwrap(result) for result in results]
+
+    def _flush(self, func, batch):
+        if self._batches.get(func) is batch:
+            del self._batches[func]
+        batch.timer.cancel()
+        task = asyncio.ensure_future(self._resolve(func, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, func, batch):
+        try:
+            results = await self._call(func, batch.items)
+        except Exception as error:
+            batch.future.set_exception(error)
+        else:
+            batch.future.set_result(results)
+
+    async def _call(self, func, items):
+        async with self._running:
+            return await self._loop.run_in_executor(
+                self._pool, _call_each, func, items)
+
+    def close(self):
+        """
+        Shuts the pool down, waiting for running batches to finish. The
+        offloader starts a new pool if it is used again.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def default_offloader():
+    """
+    Returns the offloader the module's helpers use when not given one, a
+    process pool with a worker per CPU started on first use.
+    """
+    if not _default:
+        _default.append(Offloader())
+    return _default[0]
+
+
+def _partial(func, **kwargs):
+    # Calls are batched by function, so every call with the same arguments
+    # has to use the same partial.
+    key = (func, tuple(sorted(kwargs.items())))
+    if key not in _partials:
+        _partials[key] = partial(func, **kwargs)
+    return _partials[key]
+
+
+async def strip_html(string, backend='stream', offloader=None):
+    """
+    `text.strip_html`, run in the pool of ``offloader`` (by default
+    `default_offloader`).
+
+    Example:
+
+    >>> await strip_html("<p>Hi <b>there</b></p>")
+    "Hi there"
+    """
+    func = text.strip_html
+    if backend != 'stream':
+        func = _partial(func, backend=backend)
+    return await (offloader or default_offloader()).run(func, string)
+
+
+async def strip_all_tags(string, offloader=None):
+    """
+    `text.strip_all_tags`, run in the pool of ``offloader``.
+    """
+    return await (offloader or default_offloader()).run(
+        text.strip_all_tags, string)
+
+
+async def extract_raw_text(string, offloader=None):
+    """
+    `text.extract_raw_text`, run in the pool of ``offloader``.
+    """
+    return await (offloader or default_offloader()).run(
+        text.extract_raw_text, string)
+
+
+async def parse_text(string, offloader=None):
+    """
+    `text.parse_text`, run in the pool of ``offloader``.
+    """
+    return await (offloader or default_offloader()).run(
+        text.parse_text, string)
+
+
+async def normalize_url(url, offloader=None):
+    """
+    `urls.normalize_url`, run in the pool of ``offloader``.
+    """
+    return await (offloader or default_offloader()).run(
+        urls.normalize_url, url)
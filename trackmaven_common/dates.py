@@ -1,7 +1,40 @@
-import arrow
+# dateutil and pytz are imported by the functions that need them, so that
+# importing this module only costs the standard library.
+from array import array
+from bisect import bisect_right
+from collections import Counter
 from datetime import timedelta, datetime, date
-from dateutil import parser
-import pytz
+import re
+import sys
+
+try:
+    from datetime import timezone
+    UTC = timezone.utc
+except ImportError:
+    import pytz
+    UTC = pytz.utc
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+EPOCH_DATE = EPOCH.date()
+EPOCH_ORDINAL = EPOCH_DATE.toordinal()
+
+BUCKET_GRANULARITIES = ('day', 'week', 'month')
+# The years covered by the month boundary table used by `bucketize`.
+# Timestamps outside of it are still bucketed, just more slowly.
+MONTH_TABLE_YEARS = (1900, 2200)
+
+
+# The timestamp shapes nearly all of our inputs come in,
+# YYYY-MM-DD[( |T)HH:MM[:SS[.ffffff]][Z|+HH:MM|+HHMM]], which are parsed
+# without going through dateutil.
+ISO_8601_REGEX = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})'
+    r'(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?'
+    r'(Z|[+-]\d{2}:?\d{2})?)?\Z')
+
+# Time zone name: tzinfo, for `get_timezone`.
+_timezones = {}
 
 
 def today():
@@ -11,10 +44,10 @@ def today():
     Example:
 
     >>> today()
-    datetime.datetime(2015, 6, 18, 15, 6, 59, 787694, tzinfo=tzutc())
+    datetime.datetime(2015, 6, 18, 15, 6, 59, 787694, tzinfo=datetime.timezone.utc)
 
     """
-    return arrow.utcnow().datetime
+    return datetime.now(UTC)
 
 now = today
 
@@ -26,9 +59,9 @@ def last_week():
     Example:
 
     >>> last_week()
-    datetime.datetime(2015, 6, 11, 15, 7, 12, 840317, tzinfo=tzutc())
+    datetime.datetime(2015, 6, 11, 15, 7, 12, 840317, tzinfo=datetime.timezone.utc)
     """
-    return arrow.utcnow().replace(days=-7).datetime
+    return today() - timedelta(days=7)
 
 
 def last_month():
@@ -38,9 +71,9 @@ def last_month():
     Example:
 
     >>> last_month()
-    datetime.datetime(2015, 5, 19, 15, 7, 30, 693635, tzinfo=tzutc())
+    datetime.datetime(2015, 5, 19, 15, 7, 30, 693635, tzinfo=datetime.timezone.utc)
     """
-    return arrow.utcnow().replace(days=-30).datetime
+    return today() - timedelta(days=30)
 
 
 def seconds_since_epoch(date):
@@ -53,8 +86,7 @@ def seconds_since_epoch(date):
     >>> seconds_since_epoch(d)
     1434640140
     """
-    epoch = arrow.get(0).datetime.replace(tzinfo=pytz.utc)
-    return int((date - epoch).total_seconds())
+    return int((date - EPOCH).total_seconds())
 
 
 def days_since_epoch(date):
@@ -67,24 +99,436 @@ def days_since_epoch(date):
     >>> days_since_epoch(d)
     16604
     """
-    epoch = arrow.get(0).datetime.replace(tzinfo=pytz.utc).date()
-    return int((date - epoch).days)
+    return int((date - EPOCH_DATE).days)
+
+
+def seconds_since_epoch_many(dates):
+    """
+    Returns the total seconds since 1/1/1970 (UTC timezone) of every
+    datetime of a sequence as an array of 64 bit ints. A NumPy
+    ``datetime64`` array (whose values are taken to be UTC) gives a NumPy
+    ``int64`` array.
+
+    Example:
+
+    >>> d = datetime.datetime(2015, 6, 11, 15, 7, 12, 840317, tzinfo=tzutc())
+    >>> seconds_since_epoch_many([d, d + timedelta(seconds=1)])
+    array('q', [1434035232, 1434035233])
+    """
+    numpy = _numpy_array_module(dates)
+    if numpy is not None and dates.dtype.kind == 'M':
+        micros = dates.astype('datetime64[us]').astype(numpy.int64)
+        # Truncate towards zero like int() does for dates before the epoch.
+        return numpy.sign(micros) * (numpy.abs(micros) // 1000000)
+    seconds = [int((d - EPOCH).total_seconds()) for d in dates]
+    if numpy is not None:
+        return numpy.array(seconds, dtype=numpy.int64)
+    return array('q', seconds)
+
+
+def days_since_epoch_many(dates):
+    """
+    Returns the total days since 1/1/1970 (UTC timezone) of every date of a
+    sequence as an array of 64 bit ints. A NumPy ``datetime64`` array gives
+    a NumPy ``int64`` array.
+
+    Example:
+
+    >>> days_since_epoch_many([datetime.date(2014, 6, 11), datetime.date(1970, 1, 2)])
+    array('q', [16232, 1])
+    """
+    numpy = _numpy_array_module(dates)
+    if numpy is not None and dates.dtype.kind == 'M':
+        return dates.astype('datetime64[D]').astype(numpy.int64)
+    days = [(d - EPOCH_DATE).days for d in dates]
+    if numpy is not None:
+        return numpy.array(days, dtype=numpy.int64)
+    return array('q', days)
+
+
+def _numpy_array_module(value):
+    """
+    Returns the numpy module if value is a NumPy array. NumPy is an
+    optional dependency, and if it hasn't been imported there can't be any
+    NumPy arrays to handle.
+    """
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return numpy
+    return None
+
+
+def bucketize(timestamps, granularity='day', tz=None):
+    """
+    Returns the integer id of the calendar day, ISO week or month that every
+    timestamp of a sequence falls in, as an array of 64 bit ints.
+
+    Timestamps may be datetimes (naive ones are taken to be UTC), dates or
+    seconds since the epoch, and are bucketed by their calendar in `tz` (a
+    tzinfo or a time zone name, UTC by default). Dates are bucketed as is.
+    A NumPy array of ``datetime64`` values or epoch seconds gives a NumPy
+    ``int64`` array.
+
+    Ids count from the bucket holding 1/1/1970: days since the epoch, weeks
+    since the Monday before it and months since January 1970. See
+    `bucket_start` to turn an id back into a date.
+
+    Example:
+
+    >>> bucketize([datetime.datetime(1970, 2, 3, 4, tzinfo=tzutc()), 86400], 'month')
+    array('q', [1, 0])
+
+    """
+    if granularity not in BUCKET_GRANULARITIES:
+        raise ValueError('Unknown granularity {0!r}, expected one of '
+                         '{1}'.format(granularity,
+                                      ', '.join(BUCKET_GRANULARITIES)))
+    if tz is not None:
+        tz = get_timezone(tz)
+    numpy = _numpy_array_module(timestamps)
+    if numpy is not None and timestamps.dtype.kind in 'Miuf':
+        return _bucketize_array(numpy, timestamps, granularity, tz)
+    offsets = {}
+    days = array('q', [_local_day(value, tz, offsets)
+                       for value in timestamps])
+    if granularity == 'week':
+        days = array('q', [(day + 3) // 7 for day in days])
+    elif granularity == 'month':
+        starts = _month_starts()
+        first = (MONTH_TABLE_YEARS[0] - 1970) * 12
+        days = array('q', [
+            bisect_right(starts, day) - 1 + first
+            if starts[0] <= day < starts[-1] else _month_of(day)
+            for day in days])
+    if numpy is not None:
+        return numpy.array(days, dtype=numpy.int64)
+    return days
+
+
+def bucket_start(bucket_id, granularity='day'):
+    """
+    Returns the first date of a bucket returned by `bucketize`.
+
+    Example:
+
+    >>> bucket_start(16604)
+    datetime.date(2015, 6, 18)
+    >>> bucket_start(545, 'month')
+    datetime.date(2015, 6, 1)
+
+    """
+    if granularity == 'day':
+        return EPOCH_DATE + timedelta(days=bucket_id)
+    if granularity == 'week':
+        return EPOCH_DATE + timedelta(days=bucket_id * 7 - 3)
+    if granularity == 'month':
+        return date(1970 + bucket_id // 12, bucket_id % 12 + 1, 1)
+    raise ValueError('Unknown granularity {0!r}'.format(granularity))
+
+
+def aggregate_buckets(bucket_ids, values=None):
+    """
+    Returns a dict of bucket id to the number of rows in the bucket, or the
+    sum of their `values` when given. NumPy arrays of ids are aggregated in
+    NumPy.
+
+    Example:
+
+    >>> aggregate_buckets([3, 3, 4], [1, 2, 5])
+    {3: 3, 4: 5}
+
+    """
+    numpy = _numpy_array_module(bucket_ids)
+    if numpy is not None:
+        ids, inverse = numpy.unique(bucket_ids, return_inverse=True)
+        inverse = inverse.ravel()
+        if values is None:
+            totals = numpy.bincount(inverse, minlength=len(ids))
+        else:
+            values = numpy.asarray(values)
+            totals = numpy.zeros(len(ids), dtype=values.dtype)
+            numpy.add.at(totals, inverse, values)
+        return dict(zip(ids.tolist(), totals.tolist()))
+    if values is None:
+        return dict(Counter(bucket_ids))
+    totals = {}
+    for bucket_id, value in zip(bucket_ids, values):
+        totals[bucket_id] = totals.get(bucket_id, 0) + value
+    return totals
+
+
+def _local_day(value, tz, offsets):
+    """
+    Returns the days since the epoch of the calendar date of a timestamp
+    in `tz`.
+    """
+    if isinstance(value, datetime):
+        if value.utcoffset() is None:
+            delta = value - EPOCH.replace(tzinfo=None)
+        else:
+            delta = value - EPOCH
+        seconds = delta.days * 86400 + delta.seconds
+    elif isinstance(value, date):
+        return value.toordinal() - EPOCH_ORDINAL
+    else:
+        seconds = int(value // 1)
+    if tz is not None:
+        seconds += _utc_offset(tz, seconds, offsets)
+    return seconds // 86400
+
+
+def _utc_offset(tz, seconds, offsets):
+    """
+    Returns the UTC offset in seconds of `tz` at a time in seconds since the
+    epoch. Offsets are cached by the (UTC) day in `offsets`, unless the
+    offset changes during that day.
+    """
+    day = seconds // 86400
+    offset = offsets.get(day)
+    if offset is None:
+        offset = _offset_at(tz, day * 86400)
+        if offset != _offset_at(tz, day * 86400 + 86399):
+            offset = False
+        offsets[day] = offset
+    if offset is False:
+        return _offset_at(tz, seconds)
+    return offset
+
+
+def _offset_at(tz, seconds):
+    offset = (EPOCH + timedelta(seconds=seconds)).astimezone(tz).utcoffset()
+    return offset.days * 86400 + offset.seconds
+
+
+def _bucketize_array(numpy, timestamps, granularity, tz):
+    if timestamps.dtype.kind == 'M':
+        micros = timestamps.astype('datetime64[us]').astype(numpy.int64)
+        seconds = micros // 1000000
+    else:
+        seconds = numpy.floor_divide(timestamps, 1).astype(numpy.int64)
+    if tz is not None:
+        days, inverse = numpy.unique(seconds // 86400, return_inverse=True)
+        inverse = inverse.ravel()
+        offsets = {}
+        day_offsets = numpy.array(
+            [_utc_offset(tz, int(day) * 86400, offsets) for day in days],
+            dtype=numpy.int64)
+        local = seconds + day_offsets[inverse]
+        # Days during which the offset changes are converted one by one.
+        for index, day in enumerate(days.tolist()):
+            if offsets[day] is False:
+                rows = numpy.nonzero(inverse == index)[0]
+                local[rows] = [second + _offset_at(tz, second)
+                               for second in seconds[rows].tolist()]
+        seconds = local
+    days = seconds // 86400
+    if granularity == 'week':
+        return (days + 3) // 7
+    if granularity == 'month':
+        return days.astype('datetime64[D]').astype(
+            'datetime64[M]').astype(numpy.int64)
+    return days
+
+
+_month_table = []
+
+
+def _month_starts():
+    """
+    Returns the days since the epoch of the first day of every month of
+    `MONTH_TABLE_YEARS`, building the table on first use.
+    """
+    if not _month_table:
+        first, last = MONTH_TABLE_YEARS
+        _month_table.append(array('q', [
+            date(year, month, 1).toordinal() - EPOCH_ORDINAL
+            for year in range(first, last) for month in range(1, 13)]))
+    return _month_table[0]
+
+
+def _month_of(day):
+    value = date.fromordinal(day + EPOCH_ORDINAL)
+    return (value.year - 1970) * 12 + value.month - 1
 
 
 def iso_to_utc(iso):
     """
     Returns an ISO 8601 timestamp into a python datetime object with a utc tz.
 
+    Any UTC offset in the timestamp is dropped rather than applied, as it
+    always has been; use `iso_to_timezone` to convert offsets correctly.
+
     Example:
 
     >>> iso_to_utc("2014-07-03 00:00:00")
     datetime(2014, 07, 03, 0, 0, 0, tz="utc")
     """
+    import pytz
+    parsed = _parse_iso(iso, pytz.utc)
+    if parsed is not None:
+        return parsed[0]
+    from dateutil import parser
     timestamp = parser.parse(iso)
     timestamp = timestamp.replace(tzinfo=pytz.utc)
     return timestamp
 
 
+def get_timezone(tz):
+    """
+    Returns the tzinfo of a time zone name, from zoneinfo where it is
+    available and pytz otherwise. Zones are looked up once and cached; a
+    tzinfo is returned as is. Unknown names raise a KeyError.
+
+    Example:
+
+    >>> get_timezone('America/New_York')
+    zoneinfo.ZoneInfo(key='America/New_York')
+
+    """
+    if not isinstance(tz, str):
+        return tz
+    try:
+        return _timezones[tz]
+    except KeyError:
+        pass
+    if tz.upper() == 'UTC':
+        zone = UTC
+    else:
+        try:
+            from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+        except ImportError:
+            import pytz
+            zone = pytz.timezone(tz)
+        else:
+            try:
+                zone = ZoneInfo(tz)
+            except (ZoneInfoNotFoundError, ValueError):
+                # No system or tzdata copy of the zone database.
+                import pytz
+                zone = pytz.timezone(tz)
+    _timezones[tz] = zone
+    return zone
+
+
+def to_timezone(value, tz, assume=UTC):
+    """
+    Returns a datetime converted to the time zone `tz` (a name or tzinfo).
+    A naive datetime is taken to be in `assume`, UTC by default.
+
+    Example:
+
+    >>> to_timezone(datetime.datetime(2015, 6, 18, 15), 'America/New_York')
+    datetime.datetime(2015, 6, 18, 11, 0, tzinfo=zoneinfo.ZoneInfo(key='America/New_York'))
+
+    """
+    return _to_timezone(value, get_timezone(tz), get_timezone(assume))
+
+
+def to_timezone_many(values, tz, assume=UTC):
+    """
+    Returns a list of datetimes converted to the time zone `tz`, looking the
+    zone up once for the whole sequence.
+
+    Example:
+
+    >>> to_timezone_many([datetime.datetime(2015, 6, 18, 15)], 'Asia/Tokyo')
+    [datetime.datetime(2015, 6, 19, 0, 0, tzinfo=zoneinfo.ZoneInfo(key='Asia/Tokyo'))]
+
+    """
+    tz = get_timezone(tz)
+    assume = get_timezone(assume)
+    return [_to_timezone(value, tz, assume) for value in values]
+
+
+def iso_to_timezone(iso, tz=UTC, assume=UTC):
+    """
+    Returns an ISO 8601 timestamp as a datetime in the time zone `tz`,
+    applying the UTC offset of the timestamp. Timestamps without an offset
+    are taken to be in `assume`, UTC by default.
+
+    Example:
+
+    >>> iso_to_timezone("2014-07-03T10:20:30+05:00")
+    datetime.datetime(2014, 7, 3, 5, 20, 30, tzinfo=datetime.timezone.utc)
+    >>> iso_to_timezone("2014-07-03T10:20:30Z", 'Europe/Paris')
+    datetime.datetime(2014, 7, 3, 12, 20, 30, tzinfo=zoneinfo.ZoneInfo(key='Europe/Paris'))
+
+    """
+    return _iso_to_timezone(iso, get_timezone(tz), get_timezone(assume))
+
+
+def iso_to_timezone_many(isos, tz=UTC, assume=UTC):
+    """
+    Returns a list of ISO 8601 timestamps parsed with `iso_to_timezone`,
+    looking the zones up once for the whole sequence.
+
+    Example:
+
+    >>> iso_to_timezone_many(["2014-07-03", "2014-07-03T10:20-04:00"])
+    [datetime.datetime(2014, 7, 3, 0, 0, tzinfo=datetime.timezone.utc), datetime.datetime(2014, 7, 3, 14, 20, tzinfo=datetime.timezone.utc)]
+
+    """
+    tz = get_timezone(tz)
+    assume = get_timezone(assume)
+    return [_iso_to_timezone(iso, tz, assume) for iso in isos]
+
+
+def _to_timezone(value, tz, assume):
+    if value.utcoffset() is None:
+        value = _localize(value, assume)
+    return value.astimezone(tz)
+
+
+def _localize(value, tz):
+    """
+    Returns a naive datetime as a wall clock time in `tz`. pytz zones have
+    to pick the right offset for the date, which ``replace`` doesn't do.
+    """
+    if hasattr(tz, 'localize'):
+        return tz.localize(value)
+    return value.replace(tzinfo=tz)
+
+
+def _iso_to_timezone(iso, tz, assume):
+    parsed = _parse_iso(iso)
+    if parsed is None:
+        from dateutil import parser
+        return _to_timezone(parser.parse(iso), tz, assume)
+    timestamp, offset = parsed
+    if offset is None:
+        return _to_timezone(timestamp, tz, assume)
+    if offset != 'Z':
+        minutes = int(offset[1:3]) * 60 + int(offset[-2:])
+        if offset[0] == '-':
+            timestamp += timedelta(minutes=minutes)
+        else:
+            timestamp -= timedelta(minutes=minutes)
+    return timestamp.replace(tzinfo=UTC).astimezone(tz)
+
+
+def _parse_iso(iso, tzinfo=None):
+    """
+    Returns the datetime, with ``tzinfo`` set as is, and the UTC offset
+    string (or None) of a timestamp matching `ISO_8601_REGEX`. Returns None
+    if it doesn't match or isn't a valid date.
+    """
+    try:
+        match = ISO_8601_REGEX.match(iso)
+    except TypeError:
+        return None
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    try:
+        timestamp = datetime(
+            int(year), int(month), int(day), int(hour or 0), int(minute or 0),
+            int(second or 0), int(fraction.ljust(6, '0')) if fraction else 0,
+            tzinfo)
+    except ValueError:
+        return None
+    return timestamp, offset
+
+
 def daily_date_range(date, days_ahead):
     """
     Returns a list of future dates for a number of days ahead from
@@ -97,10 +541,160 @@ def daily_date_range(date, days_ahead):
     [datetime.datetime(2015, 6, 18, 15, 9, 0, 490145, tzinfo=tzutc()), datetime.datetime(2015, 6, 19, 15, 9, 0, 490145, tzinfo=tzutc()), datetime.datetime(2015, 6, 20, 15, 9, 0, 490145, tzinfo=tzutc()), datetime.datetime(2015, 6, 21, 15, 9, 0, 490145, tzinfo=tzutc())]
 
     """
-    date_range = []
-    for day in range(days_ahead + 1):
-        date_range.append(date + timedelta(days=day))
-    return date_range
+    return list(DateRange(date, date + timedelta(days=days_ahead + 1)))
+
+
+class DateRange(object):
+    """
+    A lazy range of dates or datetimes from `start` up to, but not
+    including, `stop`, every `step` hours, days, weeks or months.
+
+    Like `range`, nothing is materialized: the length, items, slices and
+    membership are all computed from the start, step and length. Stepping
+    by months keeps the day of `start`, clamped to the end of shorter
+    months.
+
+    Example:
+
+    >>> r = DateRange(date(2014, 1, 31), date(2014, 6, 1), granularity='month')
+    >>> len(r)
+    5
+    >>> r[1]
+    datetime.date(2014, 2, 28)
+    >>> date(2014, 3, 31) in r
+    True
+
+    """
+    GRANULARITIES = {
+        'hour': timedelta(hours=1),
+        'day': timedelta(days=1),
+        'week': timedelta(weeks=1),
+        'month': None,
+    }
+
+    def __init__(self, start, stop, step=1, granularity='day'):
+        if granularity not in self.GRANULARITIES:
+            raise ValueError('Unknown granularity {0!r}, expected one of '
+                             '{1}'.format(granularity,
+                                          ', '.join(sorted(self.GRANULARITIES))))
+        if not step:
+            raise ValueError('DateRange step must not be zero')
+        if granularity == 'hour' and not isinstance(start, datetime):
+            raise TypeError('Hourly ranges need a datetime start')
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.granularity = granularity
+        # Items are `_shift(_offset + index * step)` so that slices of a
+        # monthly range keep clamping from the original start day.
+        self._offset = 0
+        self._length = self._count()
+
+    def _shift(self, units):
+        unit = self.GRANULARITIES[self.granularity]
+        if unit is not None:
+            return self.start + unit * units
+        months = self.start.month - 1 + units
+        year = self.start.year + months // 12
+        month = months % 12 + 1
+        day = min(self.start.day, _days_in_month(year, month))
+        return self.start.replace(year=year, month=month, day=day)
+
+    def _before_stop(self, value):
+        if self.step > 0:
+            return value < self.stop
+        return value > self.stop
+
+    def _count(self):
+        unit = self.GRANULARITIES[self.granularity]
+        if unit is not None:
+            span = _microseconds(self.stop - self.start)
+            step = _microseconds(unit) * self.step
+            return max(0, -(-span // step))
+        months = ((self.stop.year - self.start.year) * 12 +
+                  self.stop.month - self.start.month)
+        count = max(0, -(-months // self.step))
+        # Clamping the day can put the estimate off by one either way.
+        while count and not self._before_stop(self._shift((count - 1) *
+                                                          self.step)):
+            count -= 1
+        while self._before_stop(self._shift(count * self.step)):
+            count += 1
+        return count
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            first, last, stride = index.indices(self._length)
+            sliced = object.__new__(DateRange)
+            sliced.__dict__.update(self.__dict__)
+            sliced.step = self.step * stride
+            sliced._offset = self._offset + first * self.step
+            sliced._length = max(0, -(-(last - first) // stride))
+            sliced.stop = self._shift(sliced._offset +
+                                      sliced._length * sliced.step)
+            return sliced
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('DateRange index out of range')
+        return self._shift(self._offset + index * self.step)
+
+    def __iter__(self):
+        unit = self.GRANULARITIES[self.granularity]
+        if unit is None:
+            for index in range(self._length):
+                yield self._shift(self._offset + index * self.step)
+            return
+        value = self._shift(self._offset)
+        delta = unit * self.step
+        for _ in range(self._length):
+            yield value
+            value += delta
+
+    def __reversed__(self):
+        for index in range(self._length - 1, -1, -1):
+            yield self[index]
+
+    def __contains__(self, value):
+        # datetimes are dates too, but never equal to one.
+        if (isinstance(value, datetime) !=
+                isinstance(self.start, datetime) or
+                not isinstance(value, date)):
+            return False
+        unit = self.GRANULARITIES[self.granularity]
+        try:
+            if unit is not None:
+                units, remainder = divmod(_microseconds(value - self.start),
+                                          _microseconds(unit))
+                if remainder:
+                    return False
+            else:
+                units = ((value.year - self.start.year) * 12 +
+                         value.month - self.start.month)
+        except TypeError:
+            # Mixing naive and aware datetimes.
+            return False
+        index, remainder = divmod(units - self._offset, self.step)
+        return (not remainder and 0 <= index < self._length and
+                self[index] == value)
+
+    def __repr__(self):
+        return 'DateRange({0!r}, {1!r}, step={2!r}, granularity={3!r})'.format(
+            self[0] if self._length else self.start, self.stop, self.step,
+            self.granularity)
+
+
+def _days_in_month(year, month):
+    if month == 12:
+        return 31
+    return (date(year, month + 1, 1) - timedelta(days=1)).day
+
+
+def _microseconds(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
 
 
 def date_key_to_iso(short_date):
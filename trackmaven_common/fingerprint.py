@@ -0,0 +1,265 @@
+"""
+Fingerprints for finding near-duplicate texts, such as reposts that differ
+only in their links, hashtags, html or whitespace.
+
+A text's words are those of its `text.extract_raw_text`, lowercased.
+`simhash` condenses them into a 64-bit
+int, where similar texts differ in few bits, and `SimHashIndex` finds the
+fingerprints within a few bits of another without comparing it to every
+fingerprint added. `minhash` estimates the share of words two texts have
+in common instead.
+
+Example:
+
+>>> a = simhash("Our spring collection is live! http://bit.ly/x #spring")
+>>> b = simhash("our spring  collection is live!  #new")
+>>> a == b
+True
+>>> remove_near_duplicates(["Big news today", "big news today #launch"])
+["Big news today"]
+"""
+import hashlib
+import random
+import struct
+
+from ._parallel import imap
+from .text import extract_raw_text
+
+# Every bit of a word's hash is spread out into a 32-bit lane of a large
+# int, so that summing those ints counts the set bits of every position at
+# once. Adding LANE_ONES * (2 ** 31 - 1 - n // 2) then sets the top bit of
+# a lane exactly when more than half of the n words set that position.
+LANE_ONES = int('00000001' * 64, 16)
+LANE_TOPS = LANE_ONES << 31
+# Words whose lanes are kept. Most words of a corpus are common ones.
+LANE_CACHE_SIZE = 20000
+
+MERSENNE_PRIME = (1 << 61) - 1
+MINHASH_PERMUTATIONS = 64
+
+_lanes = {}
+_permutations = {}
+
+
+def words(text):
+    """
+    Returns the lowercased words a text is fingerprinted by, without links,
+    html or hashtags. Words are split on any whitespace; unlike
+    `text.clean_string`, words either side of a newline are kept apart.
+
+    Example:
+
+    >>> words("Check <b>this</b> out! http://yolo.co #yoloco")
+    ["check", "this", "out!"]
+    """
+    return extract_raw_text(text).lower().split()
+
+
+def _hash(word):
+    digest = hashlib.md5(word.encode('utf-8')).digest()
+    return struct.unpack('>Q', digest[:8])[0]
+
+
+def _lane(word):
+    lane = _lanes.get(word)
+    if lane is None:
+        if len(_lanes) >= LANE_CACHE_SIZE:
+            _lanes.clear()
+        bits = format(_hash(word), '064b')
+        lane = _lanes[word] = int('0000000'.join(bits), 16)
+    return lane
+
+
+def simhash(text):
+    """
+    Returns the 64-bit SimHash of a text: every bit is set when more than
+    half of the text's words set it in their hash. Texts with the same
+    words have the same fingerprint, and texts with mostly the same words
+    fingerprints a few bits apart, see `hamming_distance`.
+
+    Example:
+
+    >>> simhash("Big news today! http://t.co/abc")
+    6398847046681045837
+    """
+    tokens = words(text)
+    total = sum(map(_lane, tokens)) + LANE_ONES * ((1 << 31) - 1 -
+                                                   len(tokens) // 2)
+    # The top hex digit of every lane is now 8 or 0.
+    return int(('%0512x' % (total & LANE_TOPS))[::8].replace('8', '1'), 2)
+
+
+def simhash_many(texts, processes=None, chunksize=256, executor=None):
+    """
+    Lazily yields the `simhash` of every text of an iterable. Pass
+    ``processes`` to spread large batches over a pool of worker processes,
+    or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> list(simhash_many(["Big news today", "big news today #launch"]))
+    [15052674744433969772, 15052674744433969772]
+    """
+    return imap(simhash, texts, processes, chunksize, executor)
+
+
+def hamming_distance(a, b):
+    """
+    Returns the number of bits two fingerprints differ by.
+
+    Example:
+
+    >>> hamming_distance(0b1011, 0b0001)
+    2
+    """
+    return bin(a ^ b).count('1')
+
+
+def _minhash_permutations(count):
+    if count not in _permutations:
+        rng = random.Random(count)
+        _permutations[count] = [
+            (rng.randint(1, MERSENNE_PRIME - 1),
+             rng.randint(0, MERSENNE_PRIME - 1)) for _ in range(count)]
+    return _permutations[count]
+
+
+def minhash(text, permutations=MINHASH_PERMUTATIONS):
+    """
+    Returns the MinHash signature of the set of a text's words: for each of
+    ``permutations`` seeded hash functions, the smallest 32-bit hash of any
+    of its words. See `minhash_similarity`.
+
+    Example:
+
+    >>> len(minhash("Big news today"))
+    64
+    """
+    hashes = list(set(_hash(word) for word in words(text)))
+    if not hashes:
+        return (0xFFFFFFFF,) * permutations
+    prime = MERSENNE_PRIME
+    return tuple(min([(a * h + b) % prime for h in hashes]) & 0xFFFFFFFF
+                 for a, b in _minhash_permutations(permutations))
+
+
+def minhash_similarity(a, b):
+    """
+    Returns an estimate of the Jaccard similarity of the words of the texts
+    two `minhash` signatures were computed from: the number of words they
+    share over the number of distinct words in either.
+
+    Example:
+
+    >>> minhash_similarity(minhash("big news today"), minhash("big news"))
+    0.609375
+    """
+    if len(a) != len(b):
+        raise ValueError('Signatures must have the same number of hashes')
+    return sum(1 for x, y in zip(a, b) if x == y) / float(len(a))
+
+
+class SimHashIndex(object):
+    """
+    An index of `simhash` fingerprints, which finds those within
+    ``max_distance`` bits of a fingerprint.
+
+    Fingerprints are split into ``max_distance + 1`` bands of bits, and
+    indexed by the value of each band. Two fingerprints that differ by at
+    most ``max_distance`` bits have at least one band in common, so only
+    the fingerprints sharing a band with the one looked up are compared
+    with it, and none within ``max_distance`` bits are missed. The larger
+    ``max_distance`` the narrower the bands, and the more fingerprints are
+    compared.
+
+    Example:
+
+    >>> index = SimHashIndex(max_distance=3)
+    >>> index.add("post-1", simhash("Big news today"))
+    >>> index.near(simhash("big news  today #launch"))
+    ["post-1"]
+    """
+
+    def __init__(self, max_distance=3):
+        if not 0 <= max_distance < 32:
+            raise ValueError('max_distance must be between 0 and 31')
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        self._bands = []
+        start = 0
+        for band in range(bands):
+            width = 64 // bands + (band < 64 % bands)
+            self._bands.append((start, (1 << width) - 1))
+            start += width
+        self._tables = [{} for _ in self._bands]
+        # key: (fingerprint, the number of keys added before it)
+        self._fingerprints = {}
+        self._added = 0
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def __contains__(self, key):
+        return key in self._fingerprints
+
+    def add(self, key, fingerprint):
+        """
+        Adds a fingerprint to the index, under a key such as a post id. A
+        key added again replaces its earlier fingerprint.
+        """
+        if key in self._fingerprints:
+            self.remove(key)
+        self._fingerprints[key] = (fingerprint, self._added)
+        self._added += 1
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((fingerprint >> shift) & mask, []).append(key)
+
+    def remove(self, key):
+        """
+        Removes the fingerprint added under a key.
+        """
+        fingerprint, _ = self._fingerprints.pop(key)
+        for (shift, mask), table in zip(self._bands, self._tables):
+            band = (fingerprint >> shift) & mask
+            table[band].remove(key)
+            if not table[band]:
+                del table[band]
+
+    def near(self, fingerprint):
+        """
+        Returns the keys of the fingerprints within ``max_distance`` bits of
+        a fingerprint, nearest (then first added) first.
+        """
+        candidates = set()
+        for (shift, mask), table in zip(self._bands, self._tables):
+            candidates.update(table.get((fingerprint >> shift) & mask, ()))
+        found = []
+        for key in candidates:
+            other, added = self._fingerprints[key]
+            distance = hamming_distance(fingerprint, other)
+            if distance <= self.max_distance:
+                found.append((distance, added, key))
+        found.sort(key=lambda found: found[:2])
+        return [key for _, _, key in found]
+
+
+def remove_near_duplicates(texts, max_distance=3):
+    """
+    Returns a list of texts without the ones whose `simhash` is within
+    ``max_distance`` bits of an earlier text kept, the near-duplicate
+    counterpart of `lists.uniquify`.
+
+    Example:
+
+    >>> posts = ["Big news today", "big news today #launch", "Hello"]
+    >>> remove_near_duplicates(posts)
+    ["Big news today", "Hello"]
+    """
+    index = SimHashIndex(max_distance)
+    unique = []
+    for text in texts:
+        fingerprint = simhash(text)
+        if not index.near(fingerprint):
+            index.add(len(unique), fingerprint)
+            unique.append(text)
+    return unique
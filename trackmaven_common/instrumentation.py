@@ -0,0 +1,246 @@
+"""
+Opt-in call counts, latency and input size histograms for the public
+helpers of `dates`, `lists`, `text` and `urls`.
+
+Nothing is recorded, or costs anything, until `enable` is called: it
+replaces the helpers in their modules with counting wrappers, and `disable`
+puts the originals back. Only code that looks the helpers up on their
+module (``text.clean_string(...)`` or ``from trackmaven_common import
+clean_string`` on Python 3.7+) after `enable` is instrumented; names
+imported from a module before then keep pointing at the original. Calls
+that helpers make to each other are counted too. Helpers that return an
+iterator, like `lists.iter_unique` and the ``*_many`` helpers, are timed
+until the iterator is exhausted or closed, so their latency includes the
+work done while it is consumed.
+
+Example:
+
+>>> from trackmaven_common import instrumentation, text
+>>> instrumentation.enable(sample_rate=0.1)
+>>> text.clean_string("  a  b ")
+'a b'
+>>> instrumentation.snapshot()['text.clean_string']['calls']
+1
+"""
+from functools import wraps
+from importlib import import_module
+import inspect
+import itertools
+import threading
+import timeit
+
+MODULES = ('dates', 'lists', 'text', 'urls')
+
+# (module, name): the original helper, for every helper replaced.
+_originals = {}
+# 'module.name': _Stats, kept across enable and disable until `reset`.
+_stats = {}
+_lock = threading.Lock()
+
+
+class _Stats(object):
+    """
+    The counts for one helper. Calls are counted without the module lock,
+    which is only taken to record a sample or read the counts.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # next() on a count is atomic, so threads counting calls never
+        # contend. Reading the count takes a number too, so `peeks` is how
+        # many were taken by reads rather than calls.
+        self.counter = itertools.count(1)
+        self.peeks = 0
+        self.sampled = 0
+        self.total_seconds = 0.0
+        self.latency = {}
+        self.sizes = {}
+
+    def record(self, seconds, args):
+        # Histogram buckets are powers of two: a value is counted in the
+        # smallest bucket it is no larger than.
+        micros = _bucket(int(seconds * 1e6))
+        size = None
+        if args:
+            try:
+                size = _bucket(len(args[0]))
+            except TypeError:
+                pass
+        with _lock:
+            self.sampled += 1
+            self.total_seconds += seconds
+            self.latency[micros] = self.latency.get(micros, 0) + 1
+            if size is not None:
+                self.sizes[size] = self.sizes.get(size, 0) + 1
+
+    def calls(self):
+        """
+        Returns the number of calls counted, under the module lock.
+        """
+        calls = next(self.counter) - 1 - self.peeks
+        self.peeks += 1
+        return calls
+
+    def as_dict(self):
+        with _lock:
+            return {
+                'calls': self.calls(),
+                'sampled': self.sampled,
+                'total_seconds': self.total_seconds,
+                'latency_us': dict(self.latency),
+                'input_size': dict(self.sizes),
+            }
+
+
+def _bucket(value):
+    return 1 << max(value - 1, 0).bit_length()
+
+
+def enable(modules=MODULES, sample_rate=1.0):
+    """
+    Starts counting calls to the public functions of `modules`, timing and
+    measuring the first argument of a ``sample_rate`` share of them. Counts
+    carry on from any earlier `enable`, see `reset`.
+
+    Example:
+
+    >>> enable(['text', 'urls'], sample_rate=0.01)
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError('sample_rate must be above 0 and at most 1')
+    every = int(round(1 / sample_rate))
+    disable()
+    for module_name in modules:
+        module = import_module('trackmaven_common.' + module_name)
+        for name, func in _public_functions(module):
+            key = '{0}.{1}'.format(module_name, name)
+            stats = _stats.setdefault(key, _Stats())
+            _originals[module, name] = func
+            setattr(module, name, _instrument(func, stats, every))
+
+
+def disable():
+    """
+    Puts the original functions back, so they cost nothing extra. The counts
+    so far are kept for `snapshot`.
+    """
+    while _originals:
+        (module, name), func = _originals.popitem()
+        setattr(module, name, func)
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def reset():
+    """
+    Forgets every count recorded so far.
+    """
+    with _lock:
+        for stats in _stats.values():
+            stats.clear()
+
+
+_reset = reset
+
+
+def snapshot(reset=False):
+    """
+    Returns the counts recorded for every helper called so far, as a dict of
+    ``'module.function'`` to its ``calls``, the number of ``sampled`` calls,
+    their ``total_seconds`` and ``latency_us`` and ``input_size``
+    histograms. Histograms map each power of two to the number of samples
+    no larger than it (and larger than the power before).
+
+    Example:
+
+    >>> snapshot()['urls.clean_url']
+    {'calls': 120, 'sampled': 12, 'total_seconds': 4.1e-05, 'latency_us': {2: 9, 4: 3}, 'input_size': {32: 12}}
+    """
+    counts = dict((key, stats.as_dict()) for key, stats in _stats.items())
+    if reset:
+        _reset()
+    return dict((key, value) for key, value in counts.items()
+                if value['calls'])
+
+
+def metrics(prefix='trackmaven_common', reset=False):
+    """
+    Returns a `snapshot` flattened into ``(name, value)`` pairs, the shape
+    most metrics clients take, with histogram buckets named ``le_<n>``.
+
+    Example:
+
+    >>> metrics()[:2]
+    [('trackmaven_common.urls.clean_url.calls', 120), ('trackmaven_common.urls.clean_url.sampled', 12)]
+    """
+    flat = []
+    for key, counts in sorted(snapshot(reset).items()):
+        name = '{0}.{1}'.format(prefix, key)
+        for field in ('calls', 'sampled', 'total_seconds'):
+            flat.append(('{0}.{1}'.format(name, field), counts[field]))
+        for field in ('latency_us', 'input_size'):
+            for bucket, count in sorted(counts[field].items()):
+                flat.append(
+                    ('{0}.{1}.le_{2}'.format(name, field, bucket), count))
+    return flat
+
+
+def _public_functions(module):
+    for name, value in sorted(vars(module).items()):
+        if (not name.startswith('_') and inspect.isfunction(value) and
+                value.__module__ == module.__name__):
+            yield name, value
+
+
+def _instrument(func, stats, every):
+    timer = timeit.default_timer
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Reads of the count shift which calls are sampled, not how many.
+        if next(stats.counter) % every:
+            return func(*args, **kwargs)
+        start = timer()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            stats.record(timer() - start, args)
+            raise
+        seconds = timer() - start
+        if _is_iterator(result):
+            return _timed_iterator(result, stats, seconds, args)
+        stats.record(seconds, args)
+        return result
+    return wrapper
+
+
+def _is_iterator(value):
+    try:
+        return iter(value) is value
+    except TypeError:
+        return False
+
+
+def _timed_iterator(iterator, stats, seconds, args):
+    """
+    Yields the items of an iterator returned by a sampled call, recording
+    the time taken to call the helper and produce every item once the
+    iterator is exhausted or closed.
+    """
+    timer = timeit.default_timer
+    try:
+        while True:
+            start = timer()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                seconds += timer() - start
+            yield item
+    finally:
+        stats.record(seconds, args)
@@ -1,6 +1,15 @@
+import hashlib
+import math
+import struct
+
+from . import _parallel
+
+
 def split_every(l, size):
     """
     Splits a list, into a subsut of lists that are seperated every X element.
+    Any other iterable is split into lists, see `iter_chunks` to split it
+    lazily instead.
 
     Example:
 
@@ -8,31 +17,286 @@ def split_every(l, size):
     >>> split_every(1, 2)
     [[1, 2], [3, 4]]
     """
+    if not hasattr(l, '__getitem__') or isinstance(l, dict):
+        return list(iter_chunks(l, size))
     return [l[i:i + size] for i in range(0, len(l), size)]
 
 
-def uniquify(l):
+def iter_chunks(iterable, size, zero_copy=False):
+    """
+    Lazily splits any iterable (a generator, a database cursor...) into
+    lists of ``size`` items, only reading it as chunks are consumed. With
+    ``zero_copy``, a buffer such as bytes, a bytearray or (on Python 3) an
+    array is split into memoryview slices that share its memory instead.
+
+    Example:
+
+    >>> list(iter_chunks(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    >>> [bytes(c) for c in iter_chunks(b"abcde", 2, zero_copy=True)]
+    [b'ab', b'cd', b'e']
+    """
+    if zero_copy:
+        view = memoryview(iterable)
+        return (view[i:i + size] for i in range(0, len(view), size))
+    return _parallel.chunks(iterable, size)
+
+
+def map_chunks(func, iterable, size, executor='thread', workers=None,
+               max_in_flight=None):
+    """
+    Splits an iterable into chunks of ``size`` items and lazily yields
+    ``func(chunk)`` for every chunk, in order, computed on a ``'thread'`` or
+    ``'process'`` pool of ``workers`` (or an existing executor). Only
+    ``max_in_flight`` chunks (twice the number of workers by default) are
+    read ahead of the results consumed, so memory stays bounded however
+    long the iterable is.
+
+    Example:
+
+    >>> def save(rows):
+    ...     db.insert_many(rows)
+    ...     return len(rows)
+    >>> sum(map_chunks(save, cursor, 500, workers=4))
+    120000
+    """
+    if max_in_flight is None:
+        max_in_flight = 2 * (workers or _parallel.default_workers())
+    chunks = iter_chunks(iterable, size)
+    if not isinstance(executor, str):
+        return _parallel.bounded_map(func, chunks, executor, max_in_flight)
+    pool_class = _parallel.executor_class(executor)
+    return _map_chunks(func, chunks, pool_class, workers, max_in_flight)
+
+
+def _map_chunks(func, chunks, pool_class, workers, max_in_flight):
+    with pool_class(max_workers=workers) as pool:
+        for result in _parallel.bounded_map(func, chunks, pool, max_in_flight):
+            yield result
+
+
+def uniquify(l, key=None, seen=None):
     """
     For a list of dictionaries, removes all duplicate dict, and returns the
-    resulting list.
+    resulting list. Dicts are compared by their keys and values, including
+    nested lists, dicts and sets, and values with ``==``, so that 1, 1.0
+    and True are the same value. Pass a ``key`` function to compare items
+    by what it returns instead.
+
+    ``seen`` is the set of items already returned. Pass a `BloomFilter` to
+    dedupe in a fixed amount of memory, at the cost of occasionally
+    dropping an item that wasn't a duplicate, or to carry on deduping from
+    where an earlier run left off.
 
     Example:
 
-    >>> l = [{"foo": "bar}, {"foo": "bar"}]
+    >>> l = [{"foo": "bar"}, {"foo": "bar"}]
     >>> uniquify(l)
     [{"foo": "bar"}]
+    >>> uniquify([{"id": 1, "v": 2}, {"id": 1, "v": 3}], key=lambda d: d["id"])
+    [{"id": 1, "v": 2}]
+    >>> uniquify(l, seen=BloomFilter(capacity=1000000, error_rate=0.001))
+    [{"foo": "bar"}]
+    """
+    return list(iter_unique(l, key, seen))
+
+
+def iter_unique(iterable, key=None, seen=None):
     """
-    seen = {}
-    unique = []
-    for i in l:
-        keys = sorted([str(k) for k in i.keys()])
-        values = sorted([str(v) for v in i.values()])
-        marker = "k_".join(keys) + "v_".join(values)
+    Lazily yields the items of an iterable that haven't been seen before,
+    in order, comparing them like `uniquify`. Only a hashable marker of
+    every distinct item is kept in memory, in ``seen`` if given.
+
+    Example:
+
+    >>> rows = iter([{"foo": "bar"}, {"foo": "bar"}, {"foo": "boo"}])
+    >>> list(iter_unique(rows))
+    [{"foo": "bar"}, {"foo": "boo"}]
+    """
+    if seen is None:
+        seen = set()
+    if isinstance(seen, BloomFilter):
+        # Checks and adds an item hashing it once.
+        for item in iterable:
+            if seen.add(_marker(key(item) if key else item)):
+                yield item
+        return
+    for item in iterable:
+        marker = _marker(key(item) if key else item)
         if marker in seen:
             continue
-        seen[marker] = 1
-        unique.append(i)
-    return unique
+        seen.add(marker)
+        yield item
+
+
+# Hashable types that can be used as is in a marker.
+_SCALARS = frozenset([str, bytes, int, float, bool, type(None)])
+# int and bool, plus long on Python 2.
+_INTEGERS = (int, type(2 ** 64))
+_UNICODE = type(u'')
+
+
+def _marker(item):
+    """
+    Returns a hashable value that is equal for equal items.
+    """
+    if isinstance(item, dict):
+        try:
+            return frozenset(item.items())
+        except TypeError:
+            # Some values are unhashable, freeze them too.
+            return frozenset([(k, _freeze(v)) for k, v in item.items()])
+    return _freeze(item)
+
+
+def _freeze(value):
+    if type(value) in _SCALARS:
+        return value
+    # Containers are tagged with their type so that e.g. a list can't be
+    # mistaken for the (key, value) pairs of a dict.
+    if isinstance(value, dict):
+        return dict, frozenset([(k, _freeze(v)) for k, v in value.items()])
+    if isinstance(value, list):
+        return list, tuple([_freeze(v) for v in value])
+    if isinstance(value, tuple):
+        return tuple, tuple([_freeze(v) for v in value])
+    if isinstance(value, (set, frozenset)):
+        return set, frozenset([_freeze(v) for v in value])
+    try:
+        hash(value)
+    except TypeError:
+        return type(value), repr(value)
+    return value
+
+
+class BloomFilter(object):
+    """
+    A set-like filter using a fixed number of bits, which can tell for
+    sure that an item was never added, but reports items that were never
+    added as present with a small probability (false positives).
+
+    The filter is sized for ``capacity`` items at the given
+    ``error_rate``, unless that takes more than ``max_bytes`` of memory, in
+    which case the error rate goes up instead. Items are hashed from a
+    canonical form, so a filter saved with `to_bytes` can be reloaded with
+    `from_bytes` in another process. At most `MAX_HASHES` hash functions are
+    used, which only matters for error rates below 1e-76.
+
+    Example:
+
+    >>> seen = BloomFilter(capacity=1000000, error_rate=0.001)
+    >>> seen.add({"foo": "bar"})
+    True
+    >>> {"foo": "bar"} in seen
+    True
+    >>> seen = BloomFilter.from_bytes(seen.to_bytes())
+    """
+    # The number of hash functions is stored in a single byte.
+    MAX_HASHES = 255
+    _header = struct.Struct('>QBQ')
+
+    def __init__(self, capacity, error_rate=0.001, max_bytes=None):
+        bits = int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        if max_bytes is not None:
+            bits = min(bits, max_bytes * 8)
+        self.size = max(bits, 8)
+        self.hashes = min(self.MAX_HASHES, max(1, int(round(
+            float(self.size) / max(capacity, 1) * math.log(2)))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.md5(_canonical(item).encode('utf-8')).digest()
+        h1, h2 = struct.unpack('>QQ', digest)
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """
+        Adds an item to the filter, returning whether it was new, i.e.
+        didn't already appear to be present.
+        """
+        bits = self.bits
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item):
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        """
+        Returns the number of items added, not counting ones that already
+        appeared to be present.
+        """
+        return self.count
+
+    def __getstate__(self):
+        return self.to_bytes()
+
+    def __setstate__(self, state):
+        self.__dict__.update(self.from_bytes(state).__dict__)
+
+    def to_bytes(self):
+        """
+        Returns the filter serialized as bytes.
+        """
+        header = self._header.pack(self.size, self.hashes, self.count)
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Returns a filter serialized with `to_bytes`.
+        """
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.count = cls._header.unpack_from(data)
+        bloom.bits = bytearray(data[cls._header.size:])
+        return bloom
+
+
+def _canonical(value):
+    """
+    Returns a string for a value (or marker) that is the same in every
+    process, unlike the iteration order of the dicts and sets in it. Like
+    markers, values that are equal have the same string, e.g. 1, 1.0 and
+    True.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, _INTEGERS):
+        return 'n:%d' % value
+    if isinstance(value, float):
+        return 'n:%r' % value
+    if _UNICODE is not str and isinstance(value, _UNICODE):
+        # Python 2 ascii text equals the same bytes.
+        try:
+            value = value.encode('ascii')
+        except UnicodeError:
+            pass
+    if type(value) in _SCALARS:
+        return '%s:%r' % (type(value).__name__, value)
+    if isinstance(value, dict):
+        value = frozenset(value.items())
+    if isinstance(value, (set, frozenset)):
+        return '{%s}' % ','.join(sorted(_canonical(v) for v in value))
+    if isinstance(value, tuple):
+        return '(%s)' % ','.join(_canonical(v) for v in value)
+    if isinstance(value, list):
+        return '[%s]' % ','.join(_canonical(v) for v in value)
+    if isinstance(value, type):
+        return value.__name__
+    return '%s:%r' % (type(value).__name__, value)
 
 
 def get_index(x, index, default=None):
@@ -1,6 +1,57 @@
-from bs4 import BeautifulSoup
+from collections import namedtuple
 import re
 
+from . import _html
+from ._parallel import imap
+
+
+# Patterns are compiled once at import; the extraction helpers below run
+# once per post, so rebuilding them on every call dominates their cost.
+
+# Complete tags: start and end with an angle brace and don't contain any
+# other angle braces.
+TAG_REGEX = re.compile(r'<[^<>]*?>')
+# Trailing partial tags: an angle brace followed immediately by a
+# non-whitespace, non-numeric character.
+TRAILING_PARTIAL_TAG_REGEX = re.compile(r'<[^\s0-9].*')
+# Leading partial tags: an angle brace preceded immediately by a
+# non-whitespace, non-numeric character. A match can only ever start at the
+# beginning of a line, so anchoring it there gives the same result without
+# retrying ``.*`` from every position in the line.
+LEADING_PARTIAL_TAG_REGEX = re.compile(r'^.*[^\s0-9]>', re.MULTILINE)
+
+LINK_REGEX = re.compile(
+    r'(?:(?:http|ftp)s?://)?'  # http:// or https://
+    r'(?:(?:(?:[A-Z0-9](?:[A-Z0-9-_]{0,61}[A-Z0-9])?\.)?'  # subdomain...
+    r'(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}(?<!-)\.))|'  # domain
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|'  # ...or ipv4
+    r'\[?[A-F0-9]*:[A-F0-9:]+\]?)'  # ...or ipv6
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)(?:[^\s|^"]+)?', re.IGNORECASE)
+
+HASHTAG_REGEX = re.compile(r'#(\w+)')
+
+# Every entity extract_entities finds, in one pattern so a text is scanned
+# once. Where entities overlap the one starting first wins, and of those
+# starting at the same place the first alternative: an email address isn't
+# also a link, and a link swallows any #fragment in it.
+ENTITY_REGEX = re.compile(
+    r'(?P<email>(?<![\w.+-])[\w.+-]+@[A-Z0-9-]+(?:\.[A-Z0-9-]+)*\.[A-Z]{2,})|'
+    # Every link has a dot or colon before any whitespace, bar localhost:
+    # checking for one first saves trying the whole link pattern at every
+    # letter of every word.
+    r'(?P<link>(?=[A-Z0-9\[:])(?=[^\s.:]*[.:]|localhost)' +
+    LINK_REGEX.pattern + r')|'
+    r'(?P<hashtag>#\w+)|'
+    r'(?P<mention>(?<!\w)@\w+)|'
+    r'(?P<cashtag>(?<![\w$])\$[A-Z]{1,6}(?:\.[A-Z]{1,2})?(?!\w))',
+    re.IGNORECASE)
+# No entity contains whitespace, so only words containing one of these
+# characters (or the odd "localhost" link) need matching to ENTITY_REGEX.
+ENTITY_HINT_REGEX = re.compile(r'[#@$.:]')
+WORD_REGEX = re.compile(r'\S*')
+
 
 def clean_string(string):
     """
@@ -20,34 +71,130 @@ def clean_string(string):
     return string.strip()
 
 
-def truncate_string(string, length, end_text="..."):
+# How much of a file is read at a time by the streaming helpers.
+STREAM_CHUNK_SIZE = 64 * 1024
+# Whole strings, rather than iterables of chunks: str, and unicode on
+# Python 2.
+_STRING_TYPES = (str, type(u''))
+
+
+def iter_clean_string(source, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lazily yields pieces of the cleaned text of a text file-like object or
+    an iterable of string chunks. Joined, the pieces are
+    ``clean_string(whole_text)``, but only one chunk is held in memory at a
+    time, however large the input.
+
+    Example:
+
+    >>> "".join(iter_clean_string(["  I am ", "MES", "SY  \n  "]))
+    "I am MESSY"
+    """
+    if isinstance(source, _STRING_TYPES):
+        chunks = (source,)
+    elif hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        chunks = source
+    started = False
+    # Whether there was whitespace between the last word yielded and
+    # whatever comes next.
+    spaced = False
+    for chunk in chunks:
+        chunk = chunk.replace('\n', '').replace('\r', '')
+        if not chunk:
+            continue
+        words = chunk.split()
+        if not words:
+            spaced = True
+            continue
+        if started and (spaced or chunk[0].isspace()):
+            yield ' '
+        yield ' '.join(words)
+        started = True
+        spaced = chunk[-1].isspace()
+
+
+def clean_and_truncate(source, length, end_text="...", whole_words=False,
+                       chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Returns ``truncate_string(clean_string(text), length, end_text,
+    whole_words)`` of a file-like object or an iterable of string chunks,
+    reading no more of the input than it takes to fill ``length``.
+
+    Example:
+
+    >>> clean_and_truncate(open('article.txt'), 13)
+    "A long str..."
+    """
+    pieces = []
+    size = 0
+    for piece in iter_clean_string(source, chunk_size):
+        pieces.append(piece)
+        size += len(piece)
+        # A length shorter than end_text makes truncate_string slice from
+        # the end of the string, so all of it has to be read.
+        if size > length >= len(end_text):
+            break
+    return truncate_string(''.join(pieces), length, end_text, whole_words)
+
+
+def truncate_string(string, length, end_text="...", whole_words=False):
     """
-    Simple helper function to help truncate long strings.
+    Simple helper function to help truncate long strings. With
+    ``whole_words``, a word cut short is left out, unless it is the only
+    word.
 
     Example:
 
     >>> truncate_string("A long string", 6)
     "A l..."
+    >>> truncate_string("A long string", 9, whole_words=True)
+    "A long..."
     """
     if string and len(string) > length:
-        return string[:length - len(end_text)] + end_text
+        cut = string[:length - len(end_text)]
+        if whole_words and cut:
+            if not (cut[-1].isspace() or string[len(cut)].isspace()):
+                head = cut.rsplit(None, 1)
+                if len(head) == 2:
+                    cut = head[0]
+            cut = cut.rstrip()
+        return cut + end_text
     else:
         return string
 
 
-def strip_html(string):
+HTML_BACKENDS = {
+    'stream': _html.stream_text,
+    'lxml': _html.lxml_text,
+    'bs4': _html.bs4_text,
+}
+
+
+def strip_html(string, backend='stream'):
     """
     Helper function to remove HTML tags and whitespace from a
     given string.
 
+    The text is extracted by one of `HTML_BACKENDS`: ``'stream'``, a
+    tokenizer that never builds a tree, ``'lxml'``, which falls back to
+    ``'bs4'`` when lxml isn't installed, or ``'bs4'``, BeautifulSoup.
+
     Example:
 
     >>> strip_html("<b>  A string  </b>")
     "A string"
+    >>> strip_html("<b>  A string  </b>", backend='lxml')
+    "A string"
     """
+    if backend not in HTML_BACKENDS:
+        raise ValueError('Unknown HTML backend %r, expected one of %s' % (
+            backend, ', '.join(sorted(HTML_BACKENDS))))
+    if backend == 'lxml' and _html.lxml_modules()[0] is None:
+        backend = 'bs4'
     if string:
-        soup = BeautifulSoup(string)
-        return soup.get_text().strip()
+        return HTML_BACKENDS[backend](string).strip()
     return string
 
 
@@ -61,21 +208,135 @@ def strip_all_tags(string):
     >>> string_all_tags("Sorry to interrupt but <a href=")
     "Sorry to interrupt but "
     """
-    # Remove all strings that start and end with an angle brace and don't
-    # contain any other angle braces
-    string = re.sub(r'<[^<>]*?>', "", string)
-    # Remove all strings that start with an angle brace followed immediately by
-    # a non-whitespace, non-numeric character
-    string = re.sub(r'<[^\s0-9].*', "", string)
-    # Remove all strings that end with an angle brace preceded immediately by
-    # a non-whitespace, non-numeric character
-    string = re.sub(r'.*[^\s0-9]>', "", string)
+    # Every pass needs an angle brace to match, so plain text (the vast
+    # majority of social posts) is returned untouched.
+    if '<' not in string and '>' not in string:
+        return string
+    string = TAG_REGEX.sub("", string)
+    # The partial tag passes run over the output of the previous pass, so
+    # they are skipped once no braces of the kind they look for are left.
+    if '<' in string:
+        string = TRAILING_PARTIAL_TAG_REGEX.sub("", string)
+    if '>' in string:
+        string = LEADING_PARTIAL_TAG_REGEX.sub("", string)
     return string
 
 
+WordMatch = namedtuple('WordMatch', ['text', 'start', 'end'])
+
+
+class WordMatcher(object):
+    """
+    A set of words and phrases compiled once for finding or removing them
+    in any number of texts.
+
+    Texts are split into words on single spaces, and a phrase matches a run
+    of whole words. Where matches overlap the longest one starting first
+    wins, so a text is scanned once, looking no further ahead than the
+    longest phrase. Matchers pickle, so a large one can be built once and
+    sent to worker processes.
+
+    Example:
+
+    >>> matcher = WordMatcher(["don't", "ice cream"])
+    >>> matcher.remove("I don't like ice cream cones")
+    "I like cones"
+    >>> matcher.find("I don't like ice cream")
+    [WordMatch(text="don't", start=2, end=7), WordMatch(text='ice cream', start=13, end=22)]
+    """
+
+    def __init__(self, words):
+        single = set()
+        # Phrases are a trie of words, keyed by their first word. Nodes
+        # where a phrase ends hold a None key.
+        phrases = {}
+        for word in words:
+            tokens = word.split(' ')
+            if len(tokens) == 1:
+                single.add(word)
+                continue
+            node = phrases.setdefault(tokens[0], {})
+            for token in tokens[1:]:
+                node = node.setdefault(token, {})
+            node[None] = True
+        self._words = frozenset(single)
+        self._phrases = phrases
+
+    def _matches(self, tokens):
+        """
+        Yields the first and last + 1 token indexes of every match.
+        """
+        words = self._words
+        phrases = self._phrases
+        index = 0
+        count = len(tokens)
+        while index < count:
+            token = tokens[index]
+            end = index + 1 if token in words else index
+            node = phrases.get(token)
+            ahead = index + 1
+            while node is not None and ahead < count:
+                node = node.get(tokens[ahead])
+                ahead += 1
+                if node is not None and None in node:
+                    end = ahead
+            if end > index:
+                yield index, end
+                index = end
+            else:
+                index += 1
+
+    def remove(self, text):
+        """
+        Returns the text with every matching word and phrase removed.
+        """
+        tokens = text.split(' ')
+        if not self._phrases:
+            words = self._words
+            return ' '.join([token for token in tokens if token not in words])
+        kept = []
+        start = 0
+        for first, end in self._matches(tokens):
+            kept.extend(tokens[start:first])
+            start = end
+        kept.extend(tokens[start:])
+        return ' '.join(kept)
+
+    def find(self, text):
+        """
+        Returns a `WordMatch` with the text and character offsets of every
+        match, in order.
+        """
+        return list(self._iter_found(text))
+
+    def search(self, text):
+        """
+        Returns the first `WordMatch` in a text, or None.
+        """
+        for match in self._iter_found(text):
+            return match
+        return None
+
+    def _iter_found(self, text):
+        tokens = text.split(' ')
+        offset = 0
+        position = 0
+        for first, end in self._matches(tokens):
+            # Words are one character apart, the space they were split on.
+            while position < first:
+                offset += len(tokens[position]) + 1
+                position += 1
+            length = end - first - 1
+            for token in tokens[first:end]:
+                length += len(token)
+            yield WordMatch(text[offset:offset + length], offset,
+                            offset + length)
+
+
 def remove_words_from_text(text, words):
     """
-    Removes a list of words from a text string.
+    Removes a list of words from a text string. Words may be phrases of
+    several words, or a prebuilt `WordMatcher` to reuse across calls.
 
     Example:
 
@@ -84,9 +345,9 @@ def remove_words_from_text(text, words):
     >>> remove_words_from_text(text, banned)
     "I like ice cream"
     """
-    text_list = text.split(' ')
-    clean_text = [w for w in text_list if w not in set(words)]
-    return ' '.join(clean_text)
+    if not isinstance(words, WordMatcher):
+        words = WordMatcher(words)
+    return words.remove(text)
 
 
 def extract_links(text):
@@ -101,16 +362,7 @@ def extract_links(text):
     """
     if not text:
         return []
-    regex = re.compile(
-        r'(?:(?:http|ftp)s?://)?'  # http:// or https://
-        r'(?:(?:(?:[A-Z0-9](?:[A-Z0-9-_]{0,61}[A-Z0-9])?\.)?'  # subdomain...
-        r'(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}(?<!-)\.))|'  # domain
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|'  # ...or ipv4
-        r'\[?[A-F0-9]*:[A-F0-9:]+\]?)'  # ...or ipv6
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)(?:[^\s|^"]+)?', re.IGNORECASE)
-    return regex.findall(text)
+    return LINK_REGEX.findall(text)
 
 
 def extract_hashtags(text):
@@ -125,11 +377,72 @@ def extract_hashtags(text):
     """
     if not text:
         return []
-    regex = re.compile(r'#(\w+)')
-    hashtags = regex.findall(text)
+    hashtags = HASHTAG_REGEX.findall(text)
     return ['#' + h for h in hashtags]
 
 
+Entity = namedtuple('Entity', ['type', 'text', 'start', 'end'])
+
+ENTITY_TYPES = ('email', 'link', 'hashtag', 'mention', 'cashtag')
+
+
+def extract_entities(text):
+    """
+    Returns an `Entity` with the type, text and character offsets of every
+    email address, link, #hashtag, @mention and $cashtag in a text string,
+    in order, scanning it once.
+
+    Example:
+
+    >>> extract_entities("$AAPL up, ask @fred or fred@example.com")
+    [Entity(type='cashtag', text='$AAPL', start=0, end=5), Entity(type='mention', text='@fred', start=14, end=19), Entity(type='email', text='fred@example.com', start=23, end=39)]
+    """
+    if not text:
+        return []
+    if 'localhost' in text.lower():
+        return _find_entities(text, 0, len(text))
+    entities = []
+    word_end = 0
+    for hint in ENTITY_HINT_REGEX.finditer(text):
+        start = hint.start()
+        if start < word_end:
+            continue
+        while start and not text[start - 1].isspace():
+            start -= 1
+        word_end = WORD_REGEX.match(text, hint.start()).end()
+        entities.extend(_find_entities(text, start, word_end))
+    return entities
+
+
+def _find_entities(text, start, end):
+    return [Entity(match.lastgroup, match.group(), match.start(), match.end())
+            for match in ENTITY_REGEX.finditer(text, start, end)]
+
+
+ParsedText = namedtuple('ParsedText', ['raw_text', 'links', 'hashtags'])
+
+
+def parse_text(text):
+    """
+    Strips html from a text string once and returns its raw text (no links,
+    html or hashtags) together with the links and hashtags found in it.
+
+    Example:
+
+    >>> parse_text("Check <b>this</b> out! http://yolo.co #yoloco")
+    ParsedText(raw_text='Check this out!', links=['http://yolo.co'], hashtags=['#yoloco'])
+    """
+    clean_text = strip_all_tags(text)
+    links = extract_links(clean_text)
+    hashtags = extract_hashtags(clean_text)
+    if not links and not hashtags:
+        return ParsedText(clean_text, links, hashtags)
+    extracted = set(links)
+    extracted.update(hashtags)
+    raw_text = ' '.join([w for w in clean_text.split(' ') if w not in extracted])
+    return ParsedText(raw_text, links, hashtags)
+
+
 def extract_raw_text(text):
     """
     Removes all links, html and hashtags from a text string.
@@ -140,18 +453,104 @@ def extract_raw_text(text):
     >>> extract_raw_text(text)
     "Check this out!"
     """
-    clean_text = strip_all_tags(text)
-    extracted_links = extract_links(clean_text)
-    extracted_hashtags = extract_hashtags(clean_text)
-    return remove_words_from_text(
-        clean_text, extracted_links + extracted_hashtags)
+    return parse_text(text).raw_text
+
+
+def clean_string_many(strings, processes=None, chunksize=256,
+                      executor=None):
+    """
+    Lazily cleans every string of an iterable with `clean_string`. Pass
+    ``processes`` to spread large batches over a pool of worker processes,
+    or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> list(clean_string_many(["  I am  ", "MESSY  "]))
+    ["I am", "MESSY"]
+    """
+    return imap(clean_string, strings, processes, chunksize, executor)
+
+
+def extract_links_many(texts, processes=None, chunksize=256,
+                       executor=None):
+    """
+    Lazily yields the list of urls present in every text of an iterable.
+    Pass ``processes`` to spread large batches over a pool of worker
+    processes, or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> list(extract_links_many(["Fred went to http://google.com", "Hi"]))
+    [["http://google.com"], []]
+    """
+    return imap(extract_links, texts, processes, chunksize, executor)
+
+
+def extract_hashtags_many(texts, processes=None, chunksize=256,
+                          executor=None):
+    """
+    Lazily yields the list of hashtags present in every text of an
+    iterable. Pass ``processes`` to spread large batches over a pool of
+    worker processes, or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> list(extract_hashtags_many(["banana #yolo", "#a #b"]))
+    [['#yolo'], ['#a', '#b']]
+    """
+    return imap(extract_hashtags, texts, processes, chunksize, executor)
+
+
+def extract_raw_text_many(texts, processes=None, chunksize=256,
+                          executor=None):
+    """
+    Lazily yields the raw text (no links, html or hashtags) of every text of
+    an iterable. Pass ``processes`` to spread large batches over a pool of
+    worker processes, or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> posts = ["Check <b>this</b> out! http://yolo.co", "#yolo Nice"]
+    >>> list(extract_raw_text_many(posts, processes=4))
+    ["Check this out!", "Nice"]
+    """
+    return imap(extract_raw_text, texts, processes, chunksize, executor)
+
+
+def parse_text_many(texts, processes=None, chunksize=256, executor=None):
+    """
+    Lazily yields a `ParsedText` for every text of an iterable. Pass
+    ``processes`` to spread large batches over a pool of worker processes,
+    or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> [p.hashtags for p in parse_text_many(["banana #yolo", "#a #b"])]
+    [['#yolo'], ['#a', '#b']]
+    """
+    return imap(parse_text, texts, processes, chunksize, executor)
+
+
+def extract_entities_many(texts, processes=None, chunksize=256,
+                          executor=None):
+    """
+    Lazily yields the list of `Entity` of every text of an iterable. Pass
+    ``processes`` to spread large batches over a pool of worker processes,
+    or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> [[e.text for e in es] for es in extract_entities_many(["#a @b", "$C"])]
+    [['#a', '@b'], ['$C']]
+    """
+    return imap(extract_entities, texts, processes, chunksize, executor)
 
 
 def extract_text_from_dict(doc={}, keys=[]):
     """
     Pass in a dict and a list of keys to return a space-separated
     single string of the values in those keys.
-    Not appropriate for nested keys.
+    Not appropriate for nested keys, see `compile_text_extractor`.
 
     Example:
 
@@ -169,6 +568,91 @@ def extract_text_from_dict(doc={}, keys=[]):
     return ' '.join(text)
 
 
+# One step of a path: a dotted key, or a bracketed list index.
+PATH_STEP_REGEX = re.compile(r'(?:^|\.)([^.\[\]]+)|\[(-?\d+)\]')
+
+
+def compile_text_extractor(paths):
+    """
+    Compiles a list of paths into a `TextExtractor`, for extracting the
+    text of many documents. A path is a chain of dotted keys and list
+    indexes, e.g. ``author.profile.bio`` or ``tags[0]``.
+
+    Example:
+
+    >>> extractor = compile_text_extractor(["title", "author.name", "tags[0]"])
+    >>> extractor({"title": "Hi", "author": {"name": "Cam"}, "tags": ["a"]})
+    "Hi Cam a"
+    """
+    return TextExtractor(paths)
+
+
+class TextExtractor(object):
+    """
+    Returns the space-separated values found at a list of paths in a
+    document, like `extract_text_from_dict` does for top-level keys. Paths
+    are parsed once, when the extractor is made; paths missing from a
+    document and empty values are skipped. Extractors pickle, so they can
+    be used with ``processes``.
+
+    Example:
+
+    >>> extractor = TextExtractor(["author.profile.bio", "tags[-1]"])
+    >>> extractor({"author": {"profile": {"bio": "Cat"}}, "tags": ["a", 2]})
+    "Cat 2"
+    """
+
+    def __init__(self, paths):
+        self.paths = tuple(paths)
+        self._steps = [_parse_path(path) for path in self.paths]
+
+    def __call__(self, doc):
+        text = []
+        for steps in self._steps:
+            value = doc
+            try:
+                for step in steps:
+                    value = value[step]
+                if value:
+                    text.append(str(value))
+            except (KeyError, IndexError, TypeError):
+                pass
+        return ' '.join(text)
+
+    def many(self, docs, processes=None, chunksize=256, executor=None):
+        """
+        Lazily yields the text of every document of an iterable. Pass
+        ``processes`` to spread large batches over a pool of worker
+        processes, or an ``executor`` to reuse one pool across calls.
+
+        Example:
+
+        >>> list(TextExtractor(["a.b"]).many([{"a": {"b": 1}}, {}]))
+        ["1", ""]
+        """
+        return imap(self, docs, processes, chunksize, executor)
+
+    def __repr__(self):
+        return 'TextExtractor({0!r})'.format(list(self.paths))
+
+
+def _parse_path(path):
+    steps = []
+    end = 0
+    for match in PATH_STEP_REGEX.finditer(path):
+        key, index = match.groups()
+        # Keys after the first step follow a dot, the first one doesn't.
+        misplaced = (key is not None and
+                     match.group().startswith('.') != bool(steps))
+        if match.start() != end or misplaced:
+            break
+        steps.append(key if index is None else int(index))
+        end = match.end()
+    if not steps or end != len(path):
+        raise ValueError('Invalid path: {0!r}'.format(path))
+    return tuple(steps)
+
+
 def humanize_join(items, limit=4, ending='and more'):
     """
     Give a list of items, joins the first ones by comma and last one by and.
@@ -1,8 +1,39 @@
+from collections import namedtuple
 import re
+
+from ._parallel import imap
+
 try:
     from urllib.parse import urlsplit, urlunsplit, urlparse
 except ImportError:
     from urlparse import urlsplit, urlunsplit, urlparse
+try:
+    from functools import lru_cache
+except ImportError:
+    # Python 2 has no lru_cache, so the helpers below are never cached.
+    lru_cache = None
+
+
+URL_REGEX = re.compile(
+    r'^(?:http|ftp)s?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|'  # ...or ipv4
+    r'\[?[A-F0-9]*:[A-F0-9:]+\]?)'  # ...or ipv6
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+# Number of results each of the cached helpers keep by default, see
+# `configure_url_cache`.
+URL_CACHE_SIZE = 4096
+
+# The implementation each cached helper calls, keyed by helper name.
+_url_functions = {}
+
+# Public suffix trie, keyed by label from the rightmost one, built on first
+# use by `_public_suffix_trie`. A node maps the None key to whether its rule
+# comes from the private section of the list, if it ends a rule.
+_suffix_trie = {}
 
 
 def httpsify(url):
@@ -30,6 +61,10 @@ def parse_domain(url):
     "trackmaven.com"
     >>>
     """
+    return _url_functions['parse_domain'](url)
+
+
+def _parse_domain(url):
     if not url:
         return None
     parsed_url = urlparse(url)
@@ -55,28 +90,36 @@ def clean_url(value):
       File "<stdin>", line 1, in <module>
     ValueError: Enter a valid URL.
     """
+    return _url_functions['clean_url'](value)
+
+
+def _clean_url(value):
     if value:
-        value = value.strip()
-        value = value.encode('ascii', 'ignore').decode("utf-8")
-        url_fields = list(urlsplit((value)))
-        if not url_fields[0]:
-            # If no URL scheme given, assume http://
-            url_fields[0] = 'http'
-        if not url_fields[1]:
-            # Assume that if no domain is provided, that the path segment
-            # contains the domain.
-            url_fields[1] = url_fields[2]
-            url_fields[2] = ''
-            # Rebuild the url_fields list, since the domain segment may now
-            # contain the path too.
-            url_fields = list(urlsplit((urlunsplit(url_fields))))
-        if not url_fields[2]:
-            # the path portion may need to be added before query params
-            url_fields[2] = '/'
-        value = urlunsplit(url_fields)
+        value = urlunsplit(_clean_url_fields(value))
     return value
 
 
+def _clean_url_fields(value):
+    value = value.strip()
+    value = value.encode('ascii', 'ignore').decode("utf-8")
+    url_fields = list(urlsplit((value)))
+    if not url_fields[0]:
+        # If no URL scheme given, assume http://
+        url_fields[0] = 'http'
+    if not url_fields[1]:
+        # Assume that if no domain is provided, that the path segment
+        # contains the domain.
+        url_fields[1] = url_fields[2]
+        url_fields[2] = ''
+        # Rebuild the url_fields list, since the domain segment may now
+        # contain the path too.
+        url_fields = list(urlsplit((urlunsplit(url_fields))))
+    if not url_fields[2]:
+        # the path portion may need to be added before query params
+        url_fields[2] = '/'
+    return url_fields
+
+
 def validate_url(value):
     """
     Taken from Django' URLField. Attempts to check if a url is valid, if not
@@ -92,14 +135,278 @@ def validate_url(value):
       File "<stdin>", line 1, in <module>
     ValueError: Enter a valid URL.
     """
-    regex = re.compile(
-        r'^(?:http|ftp)s?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|'  # ...or ipv4
-        r'\[?[A-F0-9]*:[A-F0-9:]+\]?)'  # ...or ipv6
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    if not regex.search(value):
+    if not _url_functions['validate_url'](value):
         raise ValueError("Enter a valid URL.")
     return value
+
+
+def _is_valid_url(value):
+    return URL_REGEX.search(value) is not None
+
+
+def effective_domain(url, private=False):
+    """
+    Returns the registrable domain of a url or hostname: its public suffix
+    (e.g. "com" or "co.uk") plus one more label, according to the bundled
+    Public Suffix List. Returns None when the host is itself a public
+    suffix, and IP addresses as is. Suffixes from the private section of
+    the list (e.g. "github.io") are only used when ``private`` is True.
+
+    Example:
+
+    >>> effective_domain("http://blog.foo.co.uk/posts")
+    "foo.co.uk"
+    >>> effective_domain("trackmaven.github.io", private=True)
+    "trackmaven.github.io"
+    """
+    return _url_functions['effective_domain'](url, private)
+
+
+def _effective_domain(url, private=False):
+    host = _hostname(url)
+    if not host:
+        return None
+    if _is_ip(host):
+        return host
+    labels = host.split('.')
+    if '' in labels:
+        return None
+    length = _public_suffix_length(labels, private)
+    if length >= len(labels):
+        return None
+    return '.'.join(labels[-length - 1:])
+
+
+def public_suffix(url, private=False):
+    """
+    Returns the public suffix of a url or hostname, according to the
+    bundled Public Suffix List, or None for IP addresses.
+
+    Example:
+
+    >>> public_suffix("http://blog.foo.co.uk/posts")
+    "co.uk"
+    """
+    host = _hostname(url)
+    if not host or _is_ip(host):
+        return None
+    labels = host.split('.')
+    if '' in labels:
+        return None
+    return '.'.join(labels[-_public_suffix_length(labels, private):])
+
+
+def _is_ip(host):
+    return ':' in host or host.replace('.', '').isdigit()
+
+
+def _hostname(url):
+    if not url:
+        return None
+    if '//' not in url:
+        url = '//' + url
+    try:
+        host = urlsplit(url.strip()).hostname
+    except ValueError:
+        return None
+    if host:
+        return host.rstrip('.')
+    return None
+
+
+def _public_suffix_length(labels, private):
+    """
+    Returns how many of the trailing labels form the public suffix, walking
+    the trie once from the rightmost label.
+    """
+    node = _public_suffix_trie()
+    # With no matching rule, the last label is the suffix.
+    length = 1
+    for depth, label in enumerate(reversed(labels), 1):
+        if _is_rule(node.get('!' + label), private):
+            return depth - 1
+        if _is_rule(node.get('*'), private):
+            length = depth
+        node = node.get(label)
+        if node is None:
+            break
+        if _is_rule(node, private):
+            length = depth
+    return length
+
+
+def _is_rule(node, private):
+    if node is None:
+        return False
+    is_private = node.get(None)
+    return is_private is not None and (private or not is_private)
+
+
+def _public_suffix_trie():
+    if not _suffix_trie:
+        from ._public_suffixes import ICANN_RULES, PRIVATE_RULES
+        for is_private, rules in ((False, ICANN_RULES), (True, PRIVATE_RULES)):
+            for rule in rules.split():
+                for labels in _rule_labels(rule):
+                    node = _suffix_trie
+                    for label in reversed(labels):
+                        node = node.setdefault(label, {})
+                    node.setdefault(None, is_private)
+    return _suffix_trie
+
+
+def _rule_labels(rule):
+    """
+    Yields the labels of a rule, and of its punycode form if it has
+    non-ascii labels, so hosts match either way.
+    """
+    labels = rule.split('.')
+    yield labels
+    if all(ord(c) < 128 for c in rule):
+        return
+    try:
+        ascii_labels = [_ascii_label(label) for label in labels]
+    except UnicodeError:
+        return
+    yield ascii_labels
+
+
+def _ascii_label(label):
+    if label.startswith('!'):
+        return '!' + _ascii_label(label[1:])
+    if label == '*':
+        return label
+    return label.encode('idna').decode('ascii')
+
+
+UrlRecord = namedtuple('UrlRecord', ['url', 'normalized', 'valid', 'domain'])
+
+
+def normalize_url(url):
+    """
+    Cleans, validates and parses the domain of a url in one go. Never
+    raises for invalid urls: they are returned with ``valid`` set to False,
+    and a ``normalized`` url and ``domain`` of None if they can't be parsed
+    at all.
+
+    Example:
+
+    >>> normalize_url("www.trackmaven.com/blog")
+    UrlRecord(url='www.trackmaven.com/blog', normalized='http://www.trackmaven.com/blog', valid=True, domain='trackmaven.com')
+    >>> normalize_url("_.com")
+    UrlRecord(url='_.com', normalized='http://_.com/', valid=False, domain='_.com')
+    """
+    return _url_functions['normalize_url'](url)
+
+
+def _normalize_url(url):
+    if not url:
+        return UrlRecord(url, url, False, None)
+    try:
+        normalized = urlunsplit(_clean_url_fields(url))
+        # The cleaned url can split differently than its fields did, so its
+        # domain is the one `parse_domain` finds in it.
+        if normalized.startswith('http'):
+            domain = urlsplit(normalized).netloc.replace('www.', '')
+        else:
+            domain = _parse_domain(normalized)
+    except ValueError:
+        # urlsplit rejects some malformed urls, e.g. unbalanced brackets.
+        return UrlRecord(url, None, False, None)
+    return UrlRecord(url, normalized, _is_valid_url(normalized), domain)
+
+
+def normalize_many(urls, processes=None, chunksize=1024, executor=None):
+    """
+    Lazily yields a `UrlRecord` for every url of an iterable, see
+    `normalize_url`. Pass ``processes`` to spread large batches over a pool
+    of worker processes, or an ``executor`` to reuse one pool across calls.
+
+    Example:
+
+    >>> [r.domain for r in normalize_many(["www.google.com", "t.co/x"])]
+    ['google.com', 't.co']
+    """
+    return imap(normalize_url, urls, processes, chunksize, executor)
+
+
+def group_by_domain(urls, processes=None, chunksize=1024, effective=False,
+                    executor=None):
+    """
+    Normalizes every url of an iterable and indexes the valid ones by
+    domain, or by registrable domain (see `effective_domain`) if
+    ``effective`` is True. Returns the index along with the list of invalid
+    urls, as they were given. ``processes`` and ``executor`` are passed on
+    to `normalize_many`.
+
+    Example:
+
+    >>> group_by_domain(["www.google.com", "google.com/maps", "_.com"])
+    ({'google.com': ['http://www.google.com/', 'http://google.com/maps']}, ['_.com'])
+    >>> group_by_domain(["blog.foo.co.uk", "foo.co.uk/about"], effective=True)
+    ({'foo.co.uk': ['http://blog.foo.co.uk/', 'http://foo.co.uk/about']}, [])
+    """
+    domains = {}
+    invalid = []
+    for record in normalize_many(urls, processes, chunksize, executor):
+        if record.valid:
+            domain = record.domain
+            if effective:
+                # record.domain has lost every 'www.', not just a leading
+                # one, so the registrable domain comes from the url.
+                domain = effective_domain(record.normalized) or domain
+            domains.setdefault(domain, []).append(record.normalized)
+        else:
+            invalid.append(record.url)
+    return domains, invalid
+
+
+def configure_url_cache(maxsize=URL_CACHE_SIZE):
+    """
+    Sets how many results parse_domain, clean_url, validate_url,
+    normalize_url and effective_domain each remember, dropping the least
+    recently used ones first. A ``maxsize`` of 0 or None turns the caches
+    off. Reconfiguring empties the caches.
+
+    Example:
+
+    >>> configure_url_cache(100000)
+    >>> configure_url_cache(0)
+    """
+    functions = (('parse_domain', _parse_domain), ('clean_url', _clean_url),
+                 ('validate_url', _is_valid_url),
+                 ('normalize_url', _normalize_url),
+                 ('effective_domain', _effective_domain))
+    for name, func in functions:
+        if maxsize and lru_cache is not None:
+            func = lru_cache(maxsize=maxsize, typed=True)(func)
+        _url_functions[name] = func
+
+
+def url_cache_info():
+    """
+    Returns the hits, misses, maxsize and current size of every enabled
+    url cache.
+
+    Example:
+
+    >>> clean_url("www.google.com")
+    "http://www.google.com/"
+    >>> url_cache_info()["clean_url"]
+    CacheInfo(hits=0, misses=1, maxsize=4096, currsize=1)
+    """
+    return dict((name, func.cache_info())
+                for name, func in _url_functions.items()
+                if hasattr(func, 'cache_info'))
+
+
+def clear_url_cache():
+    """
+    Empties the url caches and resets their statistics.
+    """
+    for func in _url_functions.values():
+        if hasattr(func, 'cache_clear'):
+            func.cache_clear()
+
+
+configure_url_cache()